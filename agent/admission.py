@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TypeVar
+
+logger = logging.getLogger(__name__)
+
+MAX_TRACKED_BUCKETS = 10_000
+MAX_TRACKED_USERS = 10_000
+
+_T = TypeVar("_T")
+
+
+def _lru_get(cache: OrderedDict[int, _T], key: int, factory: Callable[[], _T], limit: int) -> _T:
+    """Return ``cache[key]``, creating it if needed and evicting the least recently used entry."""
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+        return value
+    value = factory()
+    cache[key] = value
+    if len(cache) > limit:
+        cache.popitem(last=False)
+    return value
+
+
+class TokenBucket:
+    __slots__ = ("_rate", "_burst", "_tokens", "_updated_at")
+
+    def __init__(self, rate_per_s: float, burst: int, now: float) -> None:
+        self._rate = rate_per_s
+        self._burst = float(burst)
+        self._tokens = float(burst)
+        self._updated_at = now
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self._burst, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    def has_token(self, now: float) -> bool:
+        self._refill(now)
+        return self._tokens >= 1.0
+
+    def take(self) -> None:
+        self._tokens -= 1.0
+
+
+@dataclass(slots=True)
+class UserUsage:
+    admitted: int = 0
+    limited: int = 0
+
+
+@dataclass(slots=True)
+class AdmissionDecision:
+    admitted: bool
+    reason: str
+
+
+class AdmissionController:
+    """Per-user and per-chat token buckets in front of the runtime queue.
+
+    A message is admitted only if both its user and chat buckets have a
+    token; tokens are taken from both together so a rejected message does
+    not drain either bucket. Allow-listed users bypass the limits.
+
+    Buckets and usage counters are kept in LRU order and capped; the entry
+    idle the longest is evicted first, so an evicted bucket has usually
+    refilled and ``usage`` covers the most recently active users.
+    """
+
+    def __init__(
+        self,
+        *,
+        user_rate_per_min: float,
+        user_burst: int,
+        chat_rate_per_min: float,
+        chat_burst: int,
+        allow_list: set[int] | None = None,
+    ) -> None:
+        self._user_rate = user_rate_per_min / 60.0
+        self._user_burst = user_burst
+        self._chat_rate = chat_rate_per_min / 60.0
+        self._chat_burst = chat_burst
+        self._allow_list = allow_list or set()
+        self._user_buckets: OrderedDict[int, TokenBucket] = OrderedDict()
+        self._chat_buckets: OrderedDict[int, TokenBucket] = OrderedDict()
+        self.usage: OrderedDict[int, UserUsage] = OrderedDict()
+
+    def admit(self, user_id: int, chat_id: int) -> AdmissionDecision:
+        usage = _lru_get(self.usage, user_id, UserUsage, MAX_TRACKED_USERS)
+        if user_id in self._allow_list:
+            usage.admitted += 1
+            return AdmissionDecision(admitted=True, reason="allow_listed")
+
+        now = time.monotonic()
+        user_bucket = self._bucket(self._user_buckets, user_id, self._user_rate, self._user_burst, now)
+        chat_bucket = self._bucket(self._chat_buckets, chat_id, self._chat_rate, self._chat_burst, now)
+        if not user_bucket.has_token(now):
+            return self._limit(usage, user_id, "user_rate_limited")
+        if not chat_bucket.has_token(now):
+            return self._limit(usage, user_id, "chat_rate_limited")
+
+        user_bucket.take()
+        chat_bucket.take()
+        usage.admitted += 1
+        return AdmissionDecision(admitted=True, reason="ok")
+
+    def top_users(self, limit: int = 10) -> list[tuple[int, UserUsage]]:
+        ranked = sorted(self.usage.items(), key=lambda item: item[1].admitted + item[1].limited, reverse=True)
+        return ranked[:limit]
+
+    def _limit(self, usage: UserUsage, user_id: int, reason: str) -> AdmissionDecision:
+        usage.limited += 1
+        if usage.limited == 1 or usage.limited % 100 == 0:
+            logger.warning("admission limited user %s (%s, total limited=%d)", user_id, reason, usage.limited)
+        return AdmissionDecision(admitted=False, reason=reason)
+
+    @staticmethod
+    def _bucket(
+        buckets: OrderedDict[int, TokenBucket],
+        key: int,
+        rate: float,
+        burst: int,
+        now: float,
+    ) -> TokenBucket:
+        return _lru_get(buckets, key, lambda: TokenBucket(rate, burst, now), MAX_TRACKED_BUCKETS)
@@ -1,12 +1,19 @@
 from __future__ import annotations
 
+import argparse
 import asyncio
 import logging
 
-from .config import get_settings
-from .llm import LLMClient
+from .admission import AdmissionController
+from .config import AccountConfig, Settings, get_settings, load_accounts
+from .diagnostics import LoopLagMonitor, SamplingProfiler, configure_loop_debug, install_profiler_signal
+from .export import register_commands as register_export_commands
+from .hosting import FairWorkerPool, HostedAccount
+from .llm import LLMClient, ModelRouter
 from .logging_setup import setup_logging
-from .memory import MemoryStore
+from .media import TranscriptionPool, VoicePipeline
+from .memory import DatabaseWriter, MemoryStore
+from .overload import OverloadController
 from .planner import Planner
 from .runtime import AgentRuntime
 from .telegram_gateway import TelegramGateway
@@ -15,49 +22,163 @@ from .tools import ToolRegistry
 logger = logging.getLogger(__name__)
 
 
-async def _run() -> None:
-    settings = get_settings()
-    setup_logging(settings.log_level)
-
-    memory = MemoryStore(settings.db_path)
+async def _build_account(
+    account: AccountConfig,
+    *,
+    settings: Settings,
+    llm: LLMClient,
+    router: ModelRouter,
+    writer: DatabaseWriter,
+    transcription: TranscriptionPool | None,
+) -> tuple[AgentRuntime, OverloadController, AdmissionController, TelegramGateway]:
+    memory = MemoryStore(account.db_path, writer=writer)
     await memory.init()
 
-    llm = LLMClient(api_key=settings.openai_api_key, model=settings.openai_model)
+    overload = OverloadController(
+        queue_wait_target_s=settings.overload_queue_wait_target_s,
+        llm_latency_target_s=settings.overload_llm_latency_target_s,
+        recover_ratio=settings.overload_recover_ratio,
+        cooldown_s=settings.overload_cooldown_s,
+    )
+    admission = AdmissionController(
+        user_rate_per_min=settings.admission_user_rate_per_min,
+        user_burst=settings.admission_user_burst,
+        chat_rate_per_min=settings.admission_chat_rate_per_min,
+        chat_burst=settings.admission_chat_burst,
+        allow_list={int(uid) for uid in settings.admission_allow_list.split(",") if uid.strip()},
+    )
     tools = ToolRegistry(memory)
-    planner = Planner(llm=llm, allowed_tools=tools.allowed_tool_names, agent_name=settings.agent_name)
+    planner = Planner(
+        llm=llm,
+        allowed_tools=tools.allowed_tool_names,
+        agent_name=account.agent_name,
+        route=router.planner_route,
+    )
     runtime = AgentRuntime(
         memory=memory,
         llm=llm,
         planner=planner,
+        router=router,
+        overload=overload,
+        admission=admission,
         tools=tools,
-        agent_name=settings.agent_name,
+        agent_name=account.agent_name,
         max_context_messages=settings.max_context_messages,
         max_reply_chars=settings.max_reply_chars,
+        speculate=settings.speculative_replies,
     )
 
+    voice = None
+    if transcription is not None:
+        voice = VoicePipeline(memory=memory, pool=transcription, max_duration_s=settings.voice_max_duration_s)
+
     gateway = TelegramGateway(
-        api_id=settings.tg_api_id,
-        api_hash=settings.tg_api_hash,
-        session_name=settings.session_name,
+        api_id=account.tg_api_id,
+        api_hash=account.tg_api_hash,
+        session_name=account.session_name,
+        voice=voice,
+    )
+    return runtime, overload, admission, gateway
+
+
+async def _run() -> None:
+    settings = get_settings()
+    setup_logging(settings.log_level)
+
+    loop = asyncio.get_running_loop()
+    if settings.asyncio_debug:
+        configure_loop_debug(loop, settings.slow_callback_ms)
+    lag_monitor = LoopLagMonitor(threshold_ms=settings.loop_lag_threshold_ms)
+    lag_monitor.start()
+    profiler = SamplingProfiler(output_dir=settings.profile_dir, interval_ms=settings.profile_interval_ms)
+    if not install_profiler_signal(loop, profiler):
+        logger.info("SIGUSR2 profiler toggle unavailable on this platform")
+
+    # Shared by every hosted account: one OpenAI HTTP pool, one DB writer
+    # thread, one transcription process pool and one worker pool.
+    llm = LLMClient(api_key=settings.openai_api_key, model=settings.openai_model)
+    router = ModelRouter(
+        planner_model=settings.planner_model or settings.openai_model,
+        fast_model=settings.fast_model or settings.openai_model,
+        strong_model=settings.strong_model or settings.openai_model,
+        fast_intents=set(settings.route_fast_intents.split(",")),
+        fast_max_chars=settings.route_fast_max_chars,
+        fast_min_confidence=settings.route_fast_min_confidence,
     )
-    gateway.register_handler(runtime.enqueue)
+    writer = DatabaseWriter()
+    transcription = None
+    if settings.enable_voice_notes:
+        transcription = TranscriptionPool(
+            transcriber=settings.voice_transcriber,
+            model=settings.voice_model,
+            workers=settings.voice_workers,
+        )
+    pool = FairWorkerPool(llm=llm, writer=writer)
 
-    await gateway.start()
+    accounts = load_accounts(settings)
+    hosted: list[tuple[HostedAccount, OverloadController, AdmissionController, TelegramGateway]] = []
+    for account in accounts:
+        runtime, overload, admission, gateway = await _build_account(
+            account,
+            settings=settings,
+            llm=llm,
+            router=router,
+            writer=writer,
+            transcription=transcription,
+        )
+        entry = HostedAccount(
+            name=account.name,
+            runtime=runtime,
+            send_reply=gateway.send_reply,
+            db_path=account.db_path,
+            overload=overload,
+        )
+        pool.add_account(entry)
+        gateway.register_handler(pool.handler_for(entry))
+        hosted.append((entry, overload, admission, gateway))
 
-    workers = [asyncio.create_task(runtime.worker(gateway.send_reply)) for _ in range(3)]
+    for _, _, _, gateway in hosted:
+        await gateway.start()
+
+    tasks = [asyncio.create_task(pool.worker()) for _ in range(settings.workers)]
+    tasks.extend(
+        asyncio.create_task(overload.monitor(entry.runtime.backlog_age_s)) for entry, overload, _, _ in hosted
+    )
+    tasks.append(asyncio.create_task(pool.report_loop(settings.resource_report_interval_s)))
 
     try:
-        logger.info("Agent is running")
-        await gateway.run()
+        logger.info("Agent is running for %d account(s): %s", len(hosted), ", ".join(a.name for a in accounts))
+        await asyncio.gather(*(gateway.run() for _, _, _, gateway in hosted))
     finally:
-        for worker in workers:
-            worker.cancel()
-        await asyncio.gather(*workers, return_exceptions=True)
-        await gateway.close()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for entry, overload, admission, gateway in hosted:
+            await entry.runtime.flush_deferred()
+            logger.info("[%s] overload metrics: %s", entry.name, overload.snapshot())
+            logger.info("[%s] speculative replies: %s", entry.name, entry.runtime.speculation.summary())
+            logger.info("[%s] admission usage (top users): %s", entry.name, admission.top_users())
+            await gateway.close()
+        if transcription is not None:
+            transcription.close()
+        logger.info("per-account resources: %s", pool.resource_report())
+        logger.info("LLM usage by route: %s", llm.usage_summary())
+        await writer.close()
+        await asyncio.to_thread(profiler.stop)
+        await lag_monitor.stop()
+
 
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="telegram-agent")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("run", help="run the agent (default)")
+    register_export_commands(subparsers)
+    args = parser.parse_args(argv)
 
-def main() -> None:
-    asyncio.run(_run())
+    if args.command in (None, "run"):
+        asyncio.run(_run())
+        return
+    args.handler(args)
 
 
 if __name__ == "__main__":
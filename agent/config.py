@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import json
 from functools import lru_cache
 from pathlib import Path
 
-from pydantic import Field
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -15,16 +16,93 @@ class Settings(BaseSettings):
 
     openai_api_key: str = Field(alias="OPENAI_API_KEY")
     openai_model: str = Field(default="gpt-4.1-mini", alias="OPENAI_MODEL")
+    planner_model: str | None = Field(default=None, alias="PLANNER_MODEL")
+    fast_model: str | None = Field(default=None, alias="FAST_MODEL")
+    strong_model: str | None = Field(default=None, alias="STRONG_MODEL")
+    route_fast_intents: str = Field(
+        default="small_talk,time_query,calculation,profile_lookup",
+        alias="ROUTE_FAST_INTENTS",
+    )
+    route_fast_max_chars: int = Field(default=280, alias="ROUTE_FAST_MAX_CHARS")
+    route_fast_min_confidence: float = Field(default=0.7, alias="ROUTE_FAST_MIN_CONFIDENCE")
 
     agent_name: str = Field(default="Orion", alias="AGENT_NAME")
     db_path: Path = Field(default=Path("./data/agent.db"), alias="DB_PATH")
     session_name: str = Field(default="./data/telegram.session", alias="SESSION_NAME")
+    accounts_file: Path | None = Field(default=None, alias="ACCOUNTS_FILE")
+    workers: int = Field(default=3, alias="WORKERS")
+    resource_report_interval_s: float = Field(default=300.0, alias="RESOURCE_REPORT_INTERVAL_S")
 
     max_context_messages: int = Field(default=25, alias="MAX_CONTEXT_MESSAGES")
     max_reply_chars: int = Field(default=1600, alias="MAX_REPLY_CHARS")
+    speculative_replies: bool = Field(default=True, alias="SPECULATIVE_REPLIES")
     enable_voice_notes: bool = Field(default=False, alias="ENABLE_VOICE_NOTES")
+    voice_transcriber: str = Field(default="agent.media:faster_whisper_transcriber", alias="VOICE_TRANSCRIBER")
+    voice_model: str = Field(default="base", alias="VOICE_MODEL")
+    voice_workers: int = Field(default=2, alias="VOICE_WORKERS")
+    voice_max_duration_s: int = Field(default=300, alias="VOICE_MAX_DURATION_S")
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
 
+    admission_user_rate_per_min: float = Field(default=20.0, alias="ADMISSION_USER_RATE_PER_MIN")
+    admission_user_burst: int = Field(default=10, alias="ADMISSION_USER_BURST")
+    admission_chat_rate_per_min: float = Field(default=30.0, alias="ADMISSION_CHAT_RATE_PER_MIN")
+    admission_chat_burst: int = Field(default=15, alias="ADMISSION_CHAT_BURST")
+    admission_allow_list: str = Field(default="", alias="ADMISSION_ALLOW_LIST")
+
+    overload_queue_wait_target_s: float = Field(default=5.0, alias="OVERLOAD_QUEUE_WAIT_TARGET_S")
+    overload_llm_latency_target_s: float = Field(default=8.0, alias="OVERLOAD_LLM_LATENCY_TARGET_S")
+    overload_recover_ratio: float = Field(default=0.7, alias="OVERLOAD_RECOVER_RATIO")
+    overload_cooldown_s: float = Field(default=15.0, alias="OVERLOAD_COOLDOWN_S")
+
+    loop_lag_threshold_ms: float = Field(default=250.0, alias="LOOP_LAG_THRESHOLD_MS")
+    asyncio_debug: bool = Field(default=False, alias="ASYNCIO_DEBUG")
+    slow_callback_ms: float = Field(default=100.0, alias="SLOW_CALLBACK_MS")
+    profile_dir: Path = Field(default=Path("./data/profiles"), alias="PROFILE_DIR")
+    profile_interval_ms: float = Field(default=5.0, alias="PROFILE_INTERVAL_MS")
+
+
+class AccountConfig(BaseModel):
+    name: str
+    session_name: str
+    db_path: Path
+    agent_name: str | None = None
+    tg_api_id: int | None = None
+    tg_api_hash: str | None = None
+
+
+def load_accounts(settings: Settings) -> list[AccountConfig]:
+    """Accounts from ACCOUNTS_FILE, or the single account described by Settings.
+
+    The file holds a JSON list of objects with ``name``, ``session_name`` and
+    ``db_path``; ``agent_name`` and Telegram API credentials default to the
+    global settings.
+    """
+    if settings.accounts_file is None:
+        raw = [{"name": "default", "session_name": settings.session_name, "db_path": settings.db_path}]
+    else:
+        raw = json.loads(settings.accounts_file.read_text(encoding="utf-8"))
+
+    accounts: list[AccountConfig] = []
+    for item in raw:
+        account = AccountConfig.model_validate(item)
+        account.agent_name = account.agent_name or settings.agent_name
+        account.tg_api_id = account.tg_api_id or settings.tg_api_id
+        account.tg_api_hash = account.tg_api_hash or settings.tg_api_hash
+        missing = [key for key in ("agent_name", "tg_api_id", "tg_api_hash") if not getattr(account, key)]
+        if missing:
+            raise ValueError(f"account {account.name!r} is missing {', '.join(missing)}")
+        account.db_path.parent.mkdir(parents=True, exist_ok=True)
+        Path(account.session_name).parent.mkdir(parents=True, exist_ok=True)
+        accounts.append(account)
+
+    names = [a.name for a in accounts]
+    if len(set(names)) != len(names):
+        raise ValueError(f"account names must be unique: {names}")
+    db_paths = [a.db_path.resolve() for a in accounts]
+    if len(set(db_paths)) != len(db_paths):
+        raise ValueError("each account needs its own db_path")
+    return accounts
+
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import signal
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def _format_thread_stack(thread_id: int) -> str:
+    frame = sys._current_frames().get(thread_id)
+    if frame is None:
+        return "(no frame)"
+    return "".join(traceback.format_stack(frame))
+
+
+def _current_task_name(loop: asyncio.AbstractEventLoop) -> str:
+    try:
+        task = asyncio.current_task(loop)
+    except RuntimeError:
+        return "(none)"
+    return task.get_name() if task is not None else "(none)"
+
+
+class LoopLagMonitor:
+    """Watchdog that reports event-loop stalls with the blocking stack.
+
+    A coroutine on the loop refreshes a heartbeat every ``interval``; a
+    daemon thread checks the heartbeat age. The thread is required because
+    a stalled loop cannot observe itself while it is blocked.
+    """
+
+    def __init__(self, *, threshold_ms: float, interval_ms: float = 100.0) -> None:
+        self._threshold = threshold_ms / 1000.0
+        self._interval = interval_ms / 1000.0
+        self._heartbeat = time.monotonic()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self.stall_count = 0
+        self.max_lag_ms = 0.0
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = self._loop.create_task(self._beat(), name="loop-lag-heartbeat")
+        self._thread = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    async def _beat(self) -> None:
+        while True:
+            expected = time.monotonic() + self._interval
+            await asyncio.sleep(self._interval)
+            lag_ms = max(0.0, time.monotonic() - expected) * 1000.0
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            self._heartbeat = time.monotonic()
+
+    def _watch(self) -> None:
+        reported_for = 0.0
+        while not self._stop.wait(self._interval):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - self._interval
+            if stalled < self._threshold or heartbeat == reported_for:
+                continue
+            reported_for = heartbeat
+            self.stall_count += 1
+            assert self._loop is not None and self._loop_thread_id is not None
+            logger.warning(
+                "event loop stalled for %.0f ms (task=%s)\n%s",
+                stalled * 1000.0,
+                _current_task_name(self._loop),
+                _format_thread_stack(self._loop_thread_id),
+            )
+
+
+class SamplingProfiler:
+    """Low-overhead stack sampler for the event-loop thread.
+
+    Samples are aggregated as collapsed stacks (``a;b;c count``), the input
+    format of flamegraph.pl and speedscope. The sampler thread writes the
+    file itself when it stops, so toggling from a loop signal handler never
+    blocks the loop on a join or file I/O.
+    """
+
+    def __init__(self, *, output_dir: Path, interval_ms: float = 5.0) -> None:
+        self._output_dir = output_dir
+        self._interval = interval_ms / 1000.0
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self.last_dump: Path | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def start(self, target_thread_id: int | None = None) -> None:
+        if self.running:
+            return
+        # Each run gets its own stop event and sample counter, so a previous
+        # run that is still writing its file is not disturbed.
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._sample,
+            args=(target_thread_id or threading.get_ident(), self._stop, Counter()),
+            name="sampling-profiler",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info("sampling profiler started (interval=%.1f ms)", self._interval * 1000.0)
+
+    def stop(self, *, wait: bool = True) -> Path | None:
+        """Stop sampling; with ``wait`` block until the file is written and return its path."""
+        if self._thread is None:
+            return None
+        thread, self._thread = self._thread, None
+        self._stop.set()
+        if not wait:
+            return None
+        thread.join()
+        return self.last_dump
+
+    def toggle(self) -> None:
+        if self.running:
+            self.stop(wait=False)
+        else:
+            self.start()
+
+    def dump(self, samples: Counter[str]) -> Path:
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path = self._output_dir / f"profile-{stamp}.folded"
+        lines = [f"{stack} {count}" for stack, count in samples.most_common()]
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        logger.info("sampling profiler wrote %d samples to %s", sum(samples.values()), path)
+        return path
+
+    def _sample(self, target_thread_id: int, stop: threading.Event, samples: Counter[str]) -> None:
+        while not stop.wait(self._interval):
+            frame = sys._current_frames().get(target_thread_id)
+            if frame is None:
+                continue
+            stack: list[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            samples[";".join(reversed(stack))] += 1
+        try:
+            self.last_dump = self.dump(samples)
+        except OSError:
+            logger.exception("sampling profiler could not write its output")
+
+
+def install_profiler_signal(loop: asyncio.AbstractEventLoop, profiler: SamplingProfiler) -> bool:
+    """Toggle ``profiler`` on SIGUSR2. Returns False where unsupported."""
+    sig = getattr(signal, "SIGUSR2", None)
+    if sig is None:
+        return False
+    try:
+        loop.add_signal_handler(sig, profiler.toggle)
+    except (NotImplementedError, RuntimeError):
+        return False
+    return True
+
+
+def configure_loop_debug(loop: asyncio.AbstractEventLoop, slow_callback_ms: float) -> None:
+    loop.set_debug(True)
+    loop.slow_callback_duration = slow_callback_ms / 1000.0
+    logging.getLogger("asyncio").setLevel(logging.WARNING)
@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from collections import Counter
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, TextIO
+
+from .memory import SCHEMA_VERSION, iso_to_us
+
+DATASETS = ("messages", "facts", "meta")
+CHUNK_SIZE = 5000
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass(slots=True)
+class ExportFilter:
+    since_us: int | None = None
+    until_us: int | None = None
+    chat_id: int | None = None
+    user_id: int | None = None
+
+
+def _us_to_datetime(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value)
+
+
+def connect_readonly(db_path: Path) -> sqlite3.Connection:
+    if not db_path.exists():
+        raise FileNotFoundError(f"database not found: {db_path}")
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version != SCHEMA_VERSION:
+        conn.close()
+        raise RuntimeError(
+            f"database schema is v{version}, export expects v{SCHEMA_VERSION}; start the agent once to migrate"
+        )
+    return conn
+
+
+def _where(flt: ExportFilter, *, chat_column: str | None, user_column: str) -> tuple[str, list[Any]]:
+    clauses: list[str] = []
+    params: list[Any] = []
+    if flt.since_us is not None:
+        clauses.append("created_at >= ?")
+        params.append(flt.since_us)
+    if flt.until_us is not None:
+        clauses.append("created_at < ?")
+        params.append(flt.until_us)
+    if flt.chat_id is not None:
+        # Only private chats are handled, where chat_id == user_id, so tables
+        # without a chat column are filtered on the user instead.
+        clauses.append(f"{chat_column or user_column} = ?")
+        params.append(flt.chat_id)
+    if flt.user_id is not None:
+        clauses.append(f"{user_column} = ?")
+        params.append(flt.user_id)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def _stream(conn: sqlite3.Connection, sql: str, params: list[Any], chunk_size: int) -> Iterator[list[tuple]]:
+    cur = conn.execute(sql, params)
+    try:
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield rows
+    finally:
+        cur.close()
+
+
+def iter_messages(conn: sqlite3.Connection, flt: ExportFilter, chunk_size: int = CHUNK_SIZE) -> Iterator[list[dict]]:
+    where, params = _where(flt, chat_column="chat_id", user_column="user_id")
+    sql = f"SELECT id, chat_id, user_id, role, text, meta_json, created_at FROM messages{where} ORDER BY id"
+    for rows in _stream(conn, sql, params, chunk_size):
+        yield [
+            {
+                "id": r[0],
+                "chat_id": r[1],
+                "user_id": r[2],
+                "role": r[3],
+                "text": r[4],
+                "meta_json": r[5],
+                "created_at": _us_to_datetime(r[6]),
+            }
+            for r in rows
+        ]
+
+
+def iter_facts(conn: sqlite3.Connection, flt: ExportFilter, chunk_size: int = CHUNK_SIZE) -> Iterator[list[dict]]:
+    where, params = _where(flt, chat_column=None, user_column="user_id")
+    sql = (
+        "SELECT id, user_id, fact_key, fact_value, confidence, created_at "
+        f"FROM user_profile_facts{where} ORDER BY id"
+    )
+    for rows in _stream(conn, sql, params, chunk_size):
+        yield [
+            {
+                "id": r[0],
+                "user_id": r[1],
+                "fact_key": r[2],
+                "fact_value": r[3],
+                "confidence": r[4],
+                "created_at": _us_to_datetime(r[5]),
+            }
+            for r in rows
+        ]
+
+
+def _meta_row(row_id: int, chat_id: int, user_id: int, meta_json: str, created_at: int) -> dict:
+    meta = json.loads(meta_json)
+    return {
+        "id": row_id,
+        "chat_id": chat_id,
+        "user_id": user_id,
+        "intent": meta.get("intent"),
+        "confidence": meta.get("confidence"),
+        "tools": [str(t) for t in meta.get("tools", [])],
+        "model_route": meta.get("model_route"),
+        "degradation_level": meta.get("degradation_level"),
+        "created_at": _us_to_datetime(created_at),
+    }
+
+
+def iter_meta(conn: sqlite3.Connection, flt: ExportFilter, chunk_size: int = CHUNK_SIZE) -> Iterator[list[dict]]:
+    where, params = _where(flt, chat_column="chat_id", user_column="user_id")
+    where = f"{where} AND role = 'assistant'" if where else " WHERE role = 'assistant'"
+    sql = f"SELECT id, chat_id, user_id, meta_json, created_at FROM messages{where} ORDER BY id"
+    for rows in _stream(conn, sql, params, chunk_size):
+        yield [_meta_row(*r) for r in rows]
+
+
+_READERS = {"messages": iter_messages, "facts": iter_facts, "meta": iter_meta}
+
+
+def _jsonl_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"not JSON serializable: {type(value).__name__}")
+
+
+def write_jsonl(chunks: Iterator[list[dict]], out: TextIO) -> int:
+    count = 0
+    for chunk in chunks:
+        out.writelines(json.dumps(row, ensure_ascii=False, default=_jsonl_default) + "\n" for row in chunk)
+        count += len(chunk)
+    return count
+
+
+def _parquet_schema(dataset: str):
+    import pyarrow as pa
+
+    ts = pa.timestamp("us", tz="UTC")
+    if dataset == "messages":
+        fields = [
+            ("id", pa.int64()),
+            ("chat_id", pa.int64()),
+            ("user_id", pa.int64()),
+            ("role", pa.string()),
+            ("text", pa.string()),
+            ("meta_json", pa.string()),
+            ("created_at", ts),
+        ]
+    elif dataset == "facts":
+        fields = [
+            ("id", pa.int64()),
+            ("user_id", pa.int64()),
+            ("fact_key", pa.string()),
+            ("fact_value", pa.string()),
+            ("confidence", pa.float64()),
+            ("created_at", ts),
+        ]
+    else:
+        fields = [
+            ("id", pa.int64()),
+            ("chat_id", pa.int64()),
+            ("user_id", pa.int64()),
+            ("intent", pa.string()),
+            ("confidence", pa.float64()),
+            ("tools", pa.list_(pa.string())),
+            ("model_route", pa.string()),
+            ("degradation_level", pa.int64()),
+            ("created_at", ts),
+        ]
+    return pa.schema(fields)
+
+
+def write_parquet(dataset: str, chunks: Iterator[list[dict]], path: Path) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:  # pragma: no cover
+        raise RuntimeError("parquet export needs `pip install pyarrow`") from exc
+
+    schema = _parquet_schema(dataset)
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+            count += len(chunk)
+    return count
+
+
+@dataclass(slots=True)
+class HistoryReport:
+    user_messages: int = 0
+    assistant_messages: int = 0
+    chats: int = 0
+    intents: Counter[str] = field(default_factory=Counter)
+    tools: Counter[str] = field(default_factory=Counter)
+    model_routes: Counter[str] = field(default_factory=Counter)
+    confidence_sum: float = 0.0
+
+    def add(self, row: dict) -> None:
+        if row["role"] != "assistant":
+            self.user_messages += 1
+            return
+        self.assistant_messages += 1
+        meta = json.loads(row["meta_json"])
+        self.intents[str(meta.get("intent", "unknown"))] += 1
+        self.tools.update(str(t) for t in meta.get("tools", []))
+        if meta.get("model_route"):
+            self.model_routes[str(meta["model_route"])] += 1
+        self.confidence_sum += float(meta.get("confidence", 0.0))
+
+    def as_dict(self) -> dict[str, Any]:
+        replies = self.assistant_messages
+        return {
+            "chats": self.chats,
+            "user_messages": self.user_messages,
+            "assistant_messages": replies,
+            "reply_rate": round(replies / self.user_messages, 4) if self.user_messages else 0.0,
+            "avg_confidence": round(self.confidence_sum / replies, 4) if replies else 0.0,
+            "intent_mix": dict(self.intents.most_common()),
+            "tool_usage": dict(self.tools.most_common()),
+            "model_routes": dict(self.model_routes.most_common()),
+        }
+
+
+def build_report(conn: sqlite3.Connection, flt: ExportFilter, chunk_size: int = CHUNK_SIZE) -> HistoryReport:
+    report = HistoryReport()
+    # Counted in SQL: a set of chat ids would grow with the database.
+    where, params = _where(flt, chat_column="chat_id", user_column="user_id")
+    report.chats = conn.execute(f"SELECT COUNT(DISTINCT chat_id) FROM messages{where}", params).fetchone()[0]
+    for chunk in iter_messages(conn, flt, chunk_size):
+        for row in chunk:
+            report.add(row)
+    return report
+
+
+def _iso_timestamp(value: str) -> int:
+    """argparse ``type`` for ``--since``/``--until``: ISO-8601 to epoch microseconds."""
+    try:
+        return iso_to_us(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not an ISO-8601 date or time: {value!r}") from None
+
+
+def _filter_from_args(args: argparse.Namespace) -> ExportFilter:
+    return ExportFilter(
+        since_us=args.since,
+        until_us=args.until,
+        chat_id=args.chat_id,
+        user_id=args.user_id,
+    )
+
+
+def _cmd_export(args: argparse.Namespace) -> None:
+    flt = _filter_from_args(args)
+    conn = connect_readonly(args.db)
+    try:
+        chunks = _READERS[args.dataset](conn, flt, args.chunk_size)
+        if args.format == "parquet":
+            if args.output is None:
+                raise SystemExit("--output is required for parquet export")
+            count = write_parquet(args.dataset, chunks, args.output)
+        elif args.output is None:
+            count = write_jsonl(chunks, sys.stdout)
+        else:
+            with args.output.open("w", encoding="utf-8") as out:
+                count = write_jsonl(chunks, out)
+    finally:
+        conn.close()
+    print(f"exported {count} {args.dataset} rows", file=sys.stderr)
+
+
+def _cmd_report(args: argparse.Namespace) -> None:
+    conn = connect_readonly(args.db)
+    try:
+        report = build_report(conn, _filter_from_args(args), args.chunk_size)
+    finally:
+        conn.close()
+    print(json.dumps(report.as_dict(), indent=2, ensure_ascii=False))
+
+
+def _add_common_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--db", type=Path, default=Path(os.environ.get("DB_PATH", "./data/agent.db")))
+    parser.add_argument("--since", type=_iso_timestamp, help="inclusive ISO-8601 start, e.g. 2024-05-01")
+    parser.add_argument("--until", type=_iso_timestamp, help="exclusive ISO-8601 end")
+    parser.add_argument("--chat-id", type=int, help="private chat id; for facts this is the user id")
+    parser.add_argument("--user-id", type=int)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+
+def register_commands(subparsers: argparse._SubParsersAction) -> None:
+    export = subparsers.add_parser("export", help="stream conversation history to JSONL or Parquet")
+    export.add_argument("dataset", choices=DATASETS)
+    export.add_argument("--format", choices=("jsonl", "parquet"), default="jsonl")
+    export.add_argument("--output", "-o", type=Path, help="output file (JSONL defaults to stdout)")
+    _add_common_arguments(export)
+    export.set_defaults(handler=_cmd_export)
+
+    report = subparsers.add_parser("report", help="reply rate, intent mix and tool usage in one pass")
+    _add_common_arguments(report)
+    report.set_defaults(handler=_cmd_report)
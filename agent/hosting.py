@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .llm import LLMClient, RouteUsage, usage_scope
+from .memory import DatabaseWriter
+from .overload import OverloadController
+from .runtime import AgentRuntime
+from .types import IncomingMessage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class AccountUsage:
+    processed: int = 0
+    busy_s: float = 0.0
+
+
+@dataclass(slots=True)
+class HostedAccount:
+    name: str
+    runtime: AgentRuntime
+    send_reply: Callable[[int, str], Awaitable[None]]
+    db_path: Path
+    overload: OverloadController | None = None
+    usage: AccountUsage = field(default_factory=AccountUsage)
+
+
+class FairWorkerPool:
+    """Shared workers serving several accounts' runtimes round-robin.
+
+    Each account keeps its own queue, admission and overload state; the
+    pool only decides which account's next message a free worker takes, so
+    one busy account cannot starve the others.
+    """
+
+    def __init__(self, *, llm: LLMClient, writer: DatabaseWriter) -> None:
+        self._llm = llm
+        self._writer = writer
+        self._accounts: list[HostedAccount] = []
+        self._cursor = 0
+        self._ready = asyncio.Event()
+
+    def add_account(self, account: HostedAccount) -> None:
+        self._accounts.append(account)
+
+    def handler_for(self, account: HostedAccount) -> Callable[[IncomingMessage], Awaitable[None]]:
+        async def _enqueue(incoming: IncomingMessage) -> None:
+            await account.runtime.enqueue(incoming)
+            self._ready.set()
+
+        return _enqueue
+
+    def _next(self) -> tuple[HostedAccount, tuple[IncomingMessage, float]] | None:
+        count = len(self._accounts)
+        for offset in range(count):
+            index = (self._cursor + offset) % count
+            account = self._accounts[index]
+            item = account.runtime.take_nowait()
+            if item is not None:
+                self._cursor = index + 1
+                return account, item
+        return None
+
+    async def worker(self) -> None:
+        while True:
+            picked = self._next()
+            if picked is None:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            account, (incoming, enqueued_at) = picked
+            token = usage_scope.set(account.name)
+            started = time.monotonic()
+            try:
+                await account.runtime.handle(incoming, enqueued_at, account.send_reply)
+            finally:
+                usage_scope.reset(token)
+                account.usage.processed += 1
+                account.usage.busy_s += time.monotonic() - started
+
+    def resource_report(self) -> dict[str, dict[str, float | int]]:
+        report: dict[str, dict[str, float | int]] = {}
+        for account in self._accounts:
+            llm = self._llm.usage_by_scope.get(account.name, RouteUsage())
+            db_bytes = sum(
+                p.stat().st_size
+                for p in (account.db_path, account.db_path.with_name(account.db_path.name + "-wal"))
+                if p.exists()
+            )
+            report[account.name] = {
+                "processed": account.usage.processed,
+                "busy_s": round(account.usage.busy_s, 1),
+                "queued": account.runtime.pending,
+                "llm_calls": llm.calls,
+                "llm_errors": llm.errors,
+                "llm_input_tokens": llm.input_tokens,
+                "llm_output_tokens": llm.output_tokens,
+                "db_writes": self._writer.writes[account.db_path],
+                "db_bytes": db_bytes,
+            }
+        return report
+
+    async def report_loop(self, interval_s: float) -> None:
+        while True:
+            await asyncio.sleep(interval_s)
+            logger.info("per-account resources: %s", self.resource_report())
+            for account in self._accounts:
+                if account.overload is not None:
+                    logger.info("[%s] overload metrics: %s", account.name, account.overload.snapshot())
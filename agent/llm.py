@@ -2,18 +2,111 @@ from __future__ import annotations
 
 import json
 import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
 from typing import Any
 
 from openai import AsyncOpenAI
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
+from .types import PlannedAction
+
 logger = logging.getLogger(__name__)
 
+# Optional label (e.g. a hosted account name) that LLM usage is also
+# attributed to. Tasks inherit it, so set it around a unit of work.
+usage_scope: ContextVar[str | None] = ContextVar("llm_usage_scope", default=None)
+
+
+@dataclass(slots=True)
+class RouteUsage:
+    calls: int = 0
+    errors: int = 0
+    latency_s: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def avg_latency_ms(self) -> float:
+        return (self.latency_s / self.calls) * 1000.0 if self.calls else 0.0
+
+
+@dataclass(slots=True)
+class ModelRoute:
+    name: str
+    model: str
+
+
+class ModelRouter:
+    """Chooses the model for each LLM call.
+
+    The planner always runs on ``planner_model``. Replies go to
+    ``fast_model`` when the plan is a confident, short, simple intent and to
+    ``strong_model`` otherwise.
+    """
+
+    def __init__(
+        self,
+        *,
+        planner_model: str,
+        fast_model: str,
+        strong_model: str,
+        fast_intents: set[str],
+        fast_max_chars: int,
+        fast_min_confidence: float,
+    ) -> None:
+        self.planner_route = ModelRoute(name="planner", model=planner_model)
+        self.fast_route = ModelRoute(name="respond_fast", model=fast_model)
+        self.strong_route = ModelRoute(name="respond_strong", model=strong_model)
+        self._fast_intents = {intent.strip().lower() for intent in fast_intents if intent.strip()}
+        self._fast_max_chars = fast_max_chars
+        self._fast_min_confidence = fast_min_confidence
+
+    def response_route(self, plan: PlannedAction, message_text: str) -> ModelRoute:
+        if len(message_text) > self._fast_max_chars:
+            return self.strong_route
+        if plan.confidence < self._fast_min_confidence:
+            return self.strong_route
+        if plan.intent.strip().lower() not in self._fast_intents:
+            return self.strong_route
+        return self.fast_route
+
+    def may_route_fast(self, message_text: str) -> bool:
+        """Whether some plan could send a reply to ``message_text`` to the fast route."""
+        return bool(self._fast_intents) and len(message_text) <= self._fast_max_chars
+
 
 class LLMClient:
     def __init__(self, api_key: str, model: str) -> None:
         self._client = AsyncOpenAI(api_key=api_key)
         self._model = model
+        self.usage: dict[str, RouteUsage] = {}
+        self.usage_by_scope: dict[str, RouteUsage] = {}
+
+    def usage_summary(self) -> str:
+        parts = [
+            f"{route}: calls={u.calls} errors={u.errors} avg={u.avg_latency_ms:.0f}ms "
+            f"in={u.input_tokens} out={u.output_tokens}"
+            for route, u in sorted(self.usage.items())
+        ]
+        return "; ".join(parts) if parts else "no LLM calls"
+
+    def _record(self, route: str, started: float, response: Any | None) -> None:
+        elapsed = time.perf_counter() - started
+        targets = [self.usage.setdefault(route, RouteUsage())]
+        scope = usage_scope.get()
+        if scope is not None:
+            targets.append(self.usage_by_scope.setdefault(scope, RouteUsage()))
+        tokens = getattr(response, "usage", None) if response is not None else None
+        for usage in targets:
+            usage.calls += 1
+            usage.latency_s += elapsed
+            if response is None:
+                usage.errors += 1
+            elif tokens is not None:
+                usage.input_tokens += int(getattr(tokens, "input_tokens", 0) or 0)
+                usage.output_tokens += int(getattr(tokens, "output_tokens", 0) or 0)
 
     @retry(
         retry=retry_if_exception_type(Exception),
@@ -21,15 +114,29 @@ class LLMClient:
         stop=stop_after_attempt(4),
         reraise=True,
     )
-    async def generate_text(self, system_prompt: str, user_prompt: str, temperature: float = 0.2) -> str:
-        response = await self._client.responses.create(
-            model=self._model,
-            input=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=temperature,
-        )
+    async def generate_text(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.2,
+        *,
+        model: str | None = None,
+        route: str = "default",
+    ) -> str:
+        started = time.perf_counter()
+        try:
+            response = await self._client.responses.create(
+                model=model or self._model,
+                input=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                temperature=temperature,
+            )
+        except Exception:
+            self._record(route, started, None)
+            raise
+        self._record(route, started, response)
         text = getattr(response, "output_text", None)
         if text:
             return text.strip()
@@ -55,8 +162,10 @@ class LLMClient:
         user_prompt: str,
         *,
         fallback: dict[str, Any],
+        model: str | None = None,
+        route: str = "default",
     ) -> dict[str, Any]:
-        raw = await self.generate_text(system_prompt, user_prompt, temperature=0.0)
+        raw = await self.generate_text(system_prompt, user_prompt, temperature=0.0, model=model, route=route)
         try:
             return json.loads(raw)
         except json.JSONDecodeError:
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import tempfile
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from .memory import MemoryStore
+
+logger = logging.getLogger(__name__)
+
+Transcriber = Callable[[str, str], str]
+
+# Set once per worker process by _init_worker.
+_worker_transcriber: Transcriber | None = None
+_worker_model: str = ""
+
+
+def load_transcriber(path: str) -> Transcriber:
+    """Resolve a ``module:function`` reference to a transcriber callable."""
+    module_name, _, attr = path.partition(":")
+    if not module_name or not attr:
+        raise ValueError(f"transcriber must look like 'module:function', got {path!r}")
+    transcriber = getattr(importlib.import_module(module_name), attr)
+    if not callable(transcriber):
+        raise ValueError(f"transcriber {path!r} is not callable")
+    return transcriber
+
+
+def _init_worker(transcriber_path: str, model: str) -> None:
+    global _worker_transcriber, _worker_model
+    _worker_transcriber = load_transcriber(transcriber_path)
+    _worker_model = model
+
+
+def _transcribe_in_worker(audio_path: str) -> str:
+    assert _worker_transcriber is not None
+    return _worker_transcriber(audio_path, _worker_model).strip()
+
+
+_whisper_models: dict[str, Any] = {}
+
+
+def faster_whisper_transcriber(audio_path: str, model: str) -> str:
+    """Default local transcriber. Requires the optional ``faster-whisper`` package."""
+    try:
+        from faster_whisper import WhisperModel
+    except ImportError as exc:  # pragma: no cover
+        raise RuntimeError("voice notes need `pip install faster-whisper`") from exc
+
+    whisper = _whisper_models.get(model)
+    if whisper is None:
+        whisper = WhisperModel(model, device="cpu", compute_type="int8")
+        _whisper_models[model] = whisper
+    segments, _ = whisper.transcribe(audio_path, vad_filter=True)
+    return " ".join(segment.text.strip() for segment in segments)
+
+
+class TranscriptionPool:
+    """Spawn-based process pool that decodes and transcribes audio files.
+
+    One pool can serve several ``VoicePipeline`` instances, e.g. one per
+    hosted account. Decoding and transcription never touch the event loop.
+    """
+
+    def __init__(self, *, transcriber: str, model: str, workers: int) -> None:
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(transcriber, model),
+        )
+        self.slots = asyncio.Semaphore(workers * 2)
+
+    async def transcribe(self, audio_path: Path) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, _transcribe_in_worker, str(audio_path))
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class VoicePipeline:
+    """Downloads voice notes to temp files and transcribes them off-loop.
+
+    Transcripts are cached in ``MemoryStore`` by Telegram document id, and
+    concurrent requests for the same file share one job.
+    """
+
+    def __init__(
+        self,
+        *,
+        memory: MemoryStore,
+        pool: TranscriptionPool,
+        max_duration_s: int,
+        temp_dir: Path | None = None,
+    ) -> None:
+        self._memory = memory
+        self._pool = pool
+        self._max_duration_s = max_duration_s
+        self._temp_dir = temp_dir
+        self._inflight: dict[int, asyncio.Future[str | None]] = {}
+
+    async def transcribe(
+        self,
+        file_id: int,
+        duration_s: int | None,
+        download: Callable[[Path], Awaitable[Any]],
+    ) -> str | None:
+        if duration_s is not None and duration_s > self._max_duration_s:
+            logger.info("skipping voice note %s: %ss exceeds limit", file_id, duration_s)
+            return None
+
+        pending = self._inflight.get(file_id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future: asyncio.Future[str | None] = asyncio.get_running_loop().create_future()
+        self._inflight[file_id] = future
+        try:
+            text = await self._transcribe_uncached(file_id, download)
+        except asyncio.CancelledError:
+            # Waiters were not cancelled themselves; fail them instead of
+            # leaving them on a future that is never resolved.
+            future.set_exception(RuntimeError(f"voice transcription {file_id} was cancelled"))
+            future.exception()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()
+            raise
+        else:
+            future.set_result(text)
+            return text
+        finally:
+            del self._inflight[file_id]
+
+    async def _transcribe_uncached(
+        self,
+        file_id: int,
+        download: Callable[[Path], Awaitable[Any]],
+    ) -> str | None:
+        cached = await self._memory.get_transcript(file_id)
+        if cached is not None:
+            return cached
+
+        async with self._pool.slots:
+            fd, name = tempfile.mkstemp(prefix="voice-", suffix=".ogg", dir=self._temp_dir)
+            os.close(fd)
+            path = Path(name)
+            try:
+                await download(path)
+                text = await self._pool.transcribe(path)
+            finally:
+                await asyncio.to_thread(path.unlink, missing_ok=True)
+
+        if text:
+            await self._memory.save_transcript(file_id, text)
+        return text or None
@@ -1,64 +1,269 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
+import sqlite3
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import aiosqlite
 
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def now_us() -> int:
+    return time.time_ns() // 1000
+
+
+def datetime_to_us(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def iso_to_us(value: str) -> int:
+    return datetime_to_us(datetime.fromisoformat(value))
+
 
 @dataclass(slots=True)
 class StoredMessage:
     role: str
     text: str
-    created_at: str
+    created_at: int
+
+
+async def _migrate_001_baseline(db: aiosqlite.Connection) -> None:
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS processed_messages (
+            chat_id INTEGER NOT NULL,
+            message_id INTEGER NOT NULL,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY(chat_id, message_id)
+        )
+        """
+    )
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            chat_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            role TEXT NOT NULL,
+            text TEXT NOT NULL,
+            meta_json TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_profile_facts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            fact_key TEXT NOT NULL,
+            fact_value TEXT NOT NULL,
+            confidence REAL NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+
+
+async def _migrate_002_integer_timestamps(db: aiosqlite.Connection) -> None:
+    # Rebuild each table with created_at as INTEGER epoch microseconds.
+    # Recent-history reads order by the monotonic rowid instead of the
+    # timestamp, so the old created_at indexes are replaced as well.
+    await db.create_function("iso_to_us", 1, iso_to_us, deterministic=True)
+
+    await db.execute(
+        """
+        CREATE TABLE processed_messages_new (
+            chat_id INTEGER NOT NULL,
+            message_id INTEGER NOT NULL,
+            created_at INTEGER NOT NULL,
+            PRIMARY KEY(chat_id, message_id)
+        ) WITHOUT ROWID
+        """
+    )
+    await db.execute(
+        """
+        INSERT INTO processed_messages_new(chat_id, message_id, created_at)
+        SELECT chat_id, message_id, iso_to_us(created_at) FROM processed_messages
+        """
+    )
+    await db.execute("DROP TABLE processed_messages")
+    await db.execute("ALTER TABLE processed_messages_new RENAME TO processed_messages")
+
+    await db.execute(
+        """
+        CREATE TABLE messages_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            chat_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            role TEXT NOT NULL,
+            text TEXT NOT NULL,
+            meta_json TEXT NOT NULL,
+            created_at INTEGER NOT NULL
+        )
+        """
+    )
+    await db.execute(
+        """
+        INSERT INTO messages_new(id, chat_id, user_id, role, text, meta_json, created_at)
+        SELECT id, chat_id, user_id, role, text, meta_json, iso_to_us(created_at) FROM messages
+        """
+    )
+    await db.execute("DROP TABLE messages")
+    await db.execute("ALTER TABLE messages_new RENAME TO messages")
+    # Keyed by rowid, so the index alone resolves the newest N ids per chat;
+    # message text is read from the table to avoid duplicating it in the index.
+    await db.execute("CREATE INDEX idx_messages_chat_recent ON messages(chat_id, id DESC)")
+
+    await db.execute(
+        """
+        CREATE TABLE user_profile_facts_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            fact_key TEXT NOT NULL,
+            fact_value TEXT NOT NULL,
+            confidence REAL NOT NULL,
+            created_at INTEGER NOT NULL
+        )
+        """
+    )
+    await db.execute(
+        """
+        INSERT INTO user_profile_facts_new(id, user_id, fact_key, fact_value, confidence, created_at)
+        SELECT id, user_id, fact_key, fact_value, confidence, iso_to_us(created_at)
+        FROM user_profile_facts
+        """
+    )
+    await db.execute("DROP TABLE user_profile_facts")
+    await db.execute("ALTER TABLE user_profile_facts_new RENAME TO user_profile_facts")
+    await db.execute(
+        """
+        CREATE INDEX idx_profile_user_recent
+        ON user_profile_facts(user_id, id DESC, fact_key, fact_value, confidence)
+        """
+    )
+
+
+async def _migrate_003_voice_transcripts(db: aiosqlite.Connection) -> None:
+    await db.execute(
+        """
+        CREATE TABLE voice_transcripts (
+            file_id INTEGER PRIMARY KEY,
+            text TEXT NOT NULL,
+            created_at INTEGER NOT NULL
+        )
+        """
+    )
+
+
+Migration = Callable[[aiosqlite.Connection], Awaitable[None]]
+
+# Append-only. Each entry runs once, in its own transaction, and bumps
+# PRAGMA user_version to its number.
+MIGRATIONS: list[tuple[int, str, Migration]] = [
+    (1, "baseline", _migrate_001_baseline),
+    (2, "integer_timestamps", _migrate_002_integer_timestamps),
+    (3, "voice_transcripts", _migrate_003_voice_transcripts),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+async def apply_migrations(db: aiosqlite.Connection) -> int:
+    async with db.execute("PRAGMA user_version") as cur:
+        row = await cur.fetchone()
+    current = int(row[0]) if row else 0
+    if current > SCHEMA_VERSION:
+        raise RuntimeError(f"database schema v{current} is newer than supported v{SCHEMA_VERSION}")
+
+    for version, name, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        logger.info("applying schema migration %03d_%s", version, name)
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            await migrate(db)
+            await db.execute(f"PRAGMA user_version = {version}")
+        except Exception:
+            await db.execute("ROLLBACK")
+            raise
+        await db.execute("COMMIT")
+        current = version
+    return current
+
+
+class DatabaseWriter:
+    """Runs every write for one or more SQLite files on a single thread.
+
+    One long-lived connection is kept per database file, so writes skip the
+    per-call connect, and stores for several accounts can share one writer
+    thread instead of spawning a connection thread per statement.
+    """
+
+    def __init__(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._connections: dict[Path, sqlite3.Connection] = {}
+        self.writes: Counter[Path] = Counter()
+
+    def _execute(self, db_path: Path, sql: str, params: tuple) -> None:
+        conn = self._connections.get(db_path)
+        if conn is None:
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._connections[db_path] = conn
+        with conn:
+            conn.execute(sql, params)
+
+    async def execute(self, db_path: Path, sql: str, params: tuple) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._execute, db_path, sql, params)
+        self.writes[db_path] += 1
+
+    def _close_connections(self) -> None:
+        for conn in self._connections.values():
+            conn.close()
+        self._connections.clear()
+
+    async def close(self) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._close_connections)
+        self._executor.shutdown(wait=True)
 
 
 class MemoryStore:
-    def __init__(self, db_path: Path) -> None:
+    """SQLite-backed history, profile facts and caches for one account.
+
+    Writes go through ``writer``; pass a shared ``DatabaseWriter`` to host
+    several stores on one thread. A store that creates its own writer closes
+    it in ``close()``; a shared writer is left for its owner to close.
+    """
+
+    def __init__(self, db_path: Path, writer: DatabaseWriter | None = None) -> None:
         self.db_path = db_path
+        self._owns_writer = writer is None
+        self._writer = writer or DatabaseWriter()
+
+    async def close(self) -> None:
+        if self._owns_writer:
+            await self._writer.close()
 
     async def init(self) -> None:
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.executescript(
-                """
-                PRAGMA journal_mode=WAL;
-
-                CREATE TABLE IF NOT EXISTS processed_messages (
-                    chat_id INTEGER NOT NULL,
-                    message_id INTEGER NOT NULL,
-                    created_at TEXT NOT NULL,
-                    PRIMARY KEY(chat_id, message_id)
-                );
-
-                CREATE TABLE IF NOT EXISTS messages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    chat_id INTEGER NOT NULL,
-                    user_id INTEGER NOT NULL,
-                    role TEXT NOT NULL,
-                    text TEXT NOT NULL,
-                    meta_json TEXT NOT NULL,
-                    created_at TEXT NOT NULL
-                );
-
-                CREATE INDEX IF NOT EXISTS idx_messages_chat_created
-                ON messages(chat_id, created_at DESC);
-
-                CREATE TABLE IF NOT EXISTS user_profile_facts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    fact_key TEXT NOT NULL,
-                    fact_value TEXT NOT NULL,
-                    confidence REAL NOT NULL,
-                    created_at TEXT NOT NULL
-                );
-
-                CREATE INDEX IF NOT EXISTS idx_profile_user
-                ON user_profile_facts(user_id, created_at DESC);
-                """
-            )
-            await db.commit()
+        async with aiosqlite.connect(self.db_path, isolation_level=None) as db:
+            await db.execute("PRAGMA journal_mode=WAL")
+            await apply_migrations(db)
 
     async def is_processed(self, chat_id: int, message_id: int) -> bool:
         async with aiosqlite.connect(self.db_path) as db:
@@ -70,16 +275,15 @@ class MemoryStore:
                 return row is not None
 
     async def mark_processed(self, chat_id: int, message_id: int) -> None:
-        now = datetime.now(timezone.utc).isoformat()
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                """
-                INSERT OR IGNORE INTO processed_messages(chat_id, message_id, created_at)
-                VALUES(?, ?, ?)
-                """,
-                (chat_id, message_id, now),
-            )
-            await db.commit()
+        now = now_us()
+        await self._writer.execute(
+            self.db_path,
+            """
+            INSERT OR IGNORE INTO processed_messages(chat_id, message_id, created_at)
+            VALUES(?, ?, ?)
+            """,
+            (chat_id, message_id, now),
+        )
 
     async def add_message(
         self,
@@ -89,17 +293,17 @@ class MemoryStore:
         role: str,
         text: str,
         meta: dict,
+        created_at_us: int | None = None,
     ) -> None:
-        now = datetime.now(timezone.utc).isoformat()
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                """
-                INSERT INTO messages(chat_id, user_id, role, text, meta_json, created_at)
-                VALUES(?, ?, ?, ?, ?, ?)
-                """,
-                (chat_id, user_id, role, text, json.dumps(meta), now),
-            )
-            await db.commit()
+        now = now_us() if created_at_us is None else created_at_us
+        await self._writer.execute(
+            self.db_path,
+            """
+            INSERT INTO messages(chat_id, user_id, role, text, meta_json, created_at)
+            VALUES(?, ?, ?, ?, ?, ?)
+            """,
+            (chat_id, user_id, role, text, json.dumps(meta), now),
+        )
 
     async def get_recent_messages(self, chat_id: int, limit: int = 20) -> list[StoredMessage]:
         async with aiosqlite.connect(self.db_path) as db:
@@ -108,26 +312,29 @@ class MemoryStore:
                 SELECT role, text, created_at
                 FROM messages
                 WHERE chat_id=?
-                ORDER BY created_at DESC
+                ORDER BY id DESC
                 LIMIT ?
                 """,
                 (chat_id, limit),
             ) as cur:
                 rows = await cur.fetchall()
 
-        return [StoredMessage(role=r[0], text=r[1], created_at=r[2]) for r in reversed(rows)]
+        # The window is the newest rows by id, but rows written late (deferred
+        # under load, with their original created_at) must still appear in
+        # the order they were received. sorted() is stable, so ties keep id order.
+        ordered = sorted(reversed(rows), key=lambda r: r[2])
+        return [StoredMessage(role=r[0], text=r[1], created_at=r[2]) for r in ordered]
 
     async def add_profile_fact(self, user_id: int, key: str, value: str, confidence: float) -> None:
-        now = datetime.now(timezone.utc).isoformat()
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                """
-                INSERT INTO user_profile_facts(user_id, fact_key, fact_value, confidence, created_at)
-                VALUES(?, ?, ?, ?, ?)
-                """,
-                (user_id, key, value, float(confidence), now),
-            )
-            await db.commit()
+        now = now_us()
+        await self._writer.execute(
+            self.db_path,
+            """
+            INSERT INTO user_profile_facts(user_id, fact_key, fact_value, confidence, created_at)
+            VALUES(?, ?, ?, ?, ?)
+            """,
+            (user_id, key, value, float(confidence), now),
+        )
 
     async def get_profile_facts(self, user_id: int, limit: int = 10) -> list[str]:
         async with aiosqlite.connect(self.db_path) as db:
@@ -136,7 +343,7 @@ class MemoryStore:
                 SELECT fact_key, fact_value, confidence
                 FROM user_profile_facts
                 WHERE user_id=?
-                ORDER BY created_at DESC
+                ORDER BY id DESC
                 LIMIT ?
                 """,
                 (user_id, limit),
@@ -144,3 +351,16 @@ class MemoryStore:
                 rows = await cur.fetchall()
 
         return [f"{k}: {v} (conf={c:.2f})" for (k, v, c) in rows]
+
+    async def get_transcript(self, file_id: int) -> str | None:
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute("SELECT text FROM voice_transcripts WHERE file_id=?", (file_id,)) as cur:
+                row = await cur.fetchone()
+        return row[0] if row else None
+
+    async def save_transcript(self, file_id: int, text: str) -> None:
+        await self._writer.execute(
+            self.db_path,
+            "INSERT OR REPLACE INTO voice_transcripts(file_id, text, created_at) VALUES(?, ?, ?)",
+            (file_id, text, now_us()),
+        )
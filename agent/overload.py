@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from enum import IntEnum
+
+logger = logging.getLogger(__name__)
+
+
+class DegradationLevel(IntEnum):
+    NORMAL = 0
+    SHRINK_CONTEXT = 1
+    HEURISTIC_PLAN = 2
+    CHEAP_MODEL = 3
+    DEFER_PERSISTENCE = 4
+    BUSY_REPLY = 5
+
+
+# Pressure (observed / target) needed to enter each level above NORMAL.
+LEVEL_THRESHOLDS = (1.0, 1.5, 2.0, 3.0, 4.0)
+
+
+class _Signal:
+    def __init__(self, alpha: float, ttl_s: float) -> None:
+        self._alpha = alpha
+        self._ttl_s = ttl_s
+        self.value = 0.0
+        self._updated_at = 0.0
+
+    def observe(self, sample: float, now: float) -> None:
+        if self._updated_at == 0.0:
+            self.value = sample
+        else:
+            self.value += self._alpha * (sample - self.value)
+        self._updated_at = now
+
+    def current(self, now: float) -> float:
+        if now - self._updated_at > self._ttl_s:
+            return 0.0
+        return self.value
+
+
+class OverloadController:
+    """Steps through degradation levels as queue wait and LLM latency grow.
+
+    Pressure is the larger of the smoothed queue wait and LLM latency, each
+    divided by its target. The level rises one step at a time while pressure
+    is above the next threshold and falls one step once pressure drops below
+    ``recover_ratio`` of the current level's threshold for ``cooldown_s``.
+    Signals older than ``signal_ttl_s`` count as zero so an idle agent
+    recovers even when no new samples arrive. The live backlog age (how long
+    the oldest queued message has waited) is also counted against the queue
+    wait target, so a stalled agent with a full queue does not recover just
+    because no message has been dequeued recently.
+    """
+
+    def __init__(
+        self,
+        *,
+        queue_wait_target_s: float,
+        llm_latency_target_s: float,
+        recover_ratio: float = 0.7,
+        cooldown_s: float = 15.0,
+        signal_ttl_s: float = 30.0,
+        alpha: float = 0.3,
+    ) -> None:
+        self._queue_wait_target_s = queue_wait_target_s
+        self._llm_latency_target_s = llm_latency_target_s
+        self._recover_ratio = recover_ratio
+        self._cooldown_s = cooldown_s
+        self._queue_wait = _Signal(alpha, signal_ttl_s)
+        self._llm_latency = _Signal(alpha, signal_ttl_s)
+        self._backlog_age_s = 0.0
+        self.level = DegradationLevel.NORMAL
+        self._changed_at = time.monotonic()
+        self.transitions = 0
+        self._time_in_level = dict.fromkeys(DegradationLevel, 0.0)
+
+    def observe_queue_wait(self, seconds: float) -> None:
+        now = time.monotonic()
+        self._queue_wait.observe(seconds, now)
+        self.update(now)
+
+    def observe_llm_latency(self, seconds: float) -> None:
+        now = time.monotonic()
+        self._llm_latency.observe(seconds, now)
+        self.update(now)
+
+    def observe_backlog(self, oldest_age_s: float) -> None:
+        self._backlog_age_s = oldest_age_s
+        self.update()
+
+    def pressure(self, now: float | None = None) -> float:
+        now = time.monotonic() if now is None else now
+        queue_wait = max(self._queue_wait.current(now), self._backlog_age_s)
+        return max(
+            queue_wait / self._queue_wait_target_s,
+            self._llm_latency.current(now) / self._llm_latency_target_s,
+        )
+
+    def update(self, now: float | None = None) -> DegradationLevel:
+        now = time.monotonic() if now is None else now
+        pressure = self.pressure(now)
+        level = self.level
+        if level < DegradationLevel.BUSY_REPLY and pressure >= LEVEL_THRESHOLDS[level]:
+            self._transition(DegradationLevel(level + 1), pressure, now)
+        elif (
+            level > DegradationLevel.NORMAL
+            and pressure < LEVEL_THRESHOLDS[level - 1] * self._recover_ratio
+            and now - self._changed_at >= self._cooldown_s
+        ):
+            self._transition(DegradationLevel(level - 1), pressure, now)
+        return self.level
+
+    def snapshot(self) -> dict[str, float | int | str]:
+        now = time.monotonic()
+        time_in_level = dict(self._time_in_level)
+        time_in_level[self.level] += now - self._changed_at
+        metrics: dict[str, float | int | str] = {
+            "level": int(self.level),
+            "level_name": self.level.name.lower(),
+            "pressure": round(self.pressure(now), 3),
+            "queue_wait_s": round(self._queue_wait.current(now), 3),
+            "llm_latency_s": round(self._llm_latency.current(now), 3),
+            "backlog_age_s": round(self._backlog_age_s, 3),
+            "transitions": self.transitions,
+        }
+        for level, seconds in time_in_level.items():
+            metrics[f"seconds_in_{level.name.lower()}"] = round(seconds, 1)
+        return metrics
+
+    async def monitor(self, backlog_age: Callable[[], float] | None = None, interval_s: float = 1.0) -> None:
+        """Re-evaluate the level every ``interval_s``, sampling ``backlog_age`` if given."""
+        while True:
+            await asyncio.sleep(interval_s)
+            if backlog_age is not None:
+                self.observe_backlog(backlog_age())
+            else:
+                self.update()
+
+    def _transition(self, level: DegradationLevel, pressure: float, now: float) -> None:
+        previous = self.level
+        self._time_in_level[previous] += now - self._changed_at
+        self.level = level
+        self._changed_at = now
+        self.transitions += 1
+        log = logger.warning if level > previous else logger.info
+        log(
+            "overload level %s -> %s (pressure=%.2f queue_wait=%.2fs llm_latency=%.2fs)",
+            previous.name.lower(),
+            level.name.lower(),
+            pressure,
+            self._queue_wait.current(now),
+            self._llm_latency.current(now),
+        )
@@ -1,15 +1,54 @@
 from __future__ import annotations
 
-from .llm import LLMClient
+import re
+
+from .llm import LLMClient, ModelRoute
 from .prompts import PLANNER_SYSTEM_PROMPT, build_planner_user_prompt
 from .types import PlannedAction
 
+TIME_QUERY_RE = re.compile(r"\b(?:what time|current time|time is it|today's date|what day)\b", re.IGNORECASE)
+ARITHMETIC_RE = re.compile(r"\d\s*[-+*/%^]\s*\d|\b(?:calculate|compute|how much is)\b", re.IGNORECASE)
+PROFILE_RE = re.compile(r"\b(?:my name|about me|remember me|where do i live|who am i)\b", re.IGNORECASE)
+
+
+def likely_needs_tools(text: str) -> bool:
+    """Cheap guess at whether the planner will request a tool call."""
+    return any(p.search(text) for p in (TIME_QUERY_RE, ARITHMETIC_RE, PROFILE_RE))
+
+
+def heuristic_plan(text: str) -> PlannedAction:
+    """LLM-free plan used when the runtime sheds load."""
+    if TIME_QUERY_RE.search(text):
+        return PlannedAction(
+            should_reply=True,
+            intent="time_query",
+            confidence=0.7,
+            reply_style="clear_direct",
+            tool_calls=[{"name": "now_time", "args": {}}],
+            rationale="heuristic planner path",
+        )
+    return PlannedAction(
+        should_reply=True,
+        intent="general_question",
+        confidence=0.5,
+        reply_style="clear_direct",
+        tool_calls=[],
+        rationale="heuristic planner path",
+    )
+
 
 class Planner:
-    def __init__(self, llm: LLMClient, allowed_tools: set[str], agent_name: str) -> None:
+    def __init__(
+        self,
+        llm: LLMClient,
+        allowed_tools: set[str],
+        agent_name: str,
+        route: ModelRoute | None = None,
+    ) -> None:
         self._llm = llm
         self._allowed_tools = allowed_tools
         self._agent_name = agent_name
+        self._route = route
 
     async def plan(self, sender_name: str, text: str, context_lines: list[str]) -> PlannedAction:
         fallback = {
@@ -29,6 +68,8 @@ class Planner:
                 context_lines=context_lines,
             ),
             fallback=fallback,
+            model=self._route.model if self._route else None,
+            route=self._route.name if self._route else "planner",
         )
 
         tool_calls = []
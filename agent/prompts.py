@@ -13,6 +13,7 @@ Return strict JSON with keys:
 Rules:
 - Reply only when the user asks a direct question or requests help.
 - Keep confidence realistic.
+- Prefer these intent labels: small_talk, time_query, calculation, profile_lookup, general_question, complex_reasoning.
 - Use tools only when needed.
 - Never hallucinate tool names. Allowed tools: now_time, calculator, recall_user_profile.
 """.strip()
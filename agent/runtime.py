@@ -3,23 +3,51 @@ from __future__ import annotations
 import asyncio
 import logging
 import re
+import time
+from collections import deque
+from collections.abc import Awaitable
+from dataclasses import dataclass
 
-from .llm import LLMClient
-from .memory import MemoryStore
-from .planner import Planner
+from .admission import AdmissionController
+from .llm import LLMClient, ModelRoute, ModelRouter
+from .memory import MemoryStore, datetime_to_us
+from .overload import DegradationLevel, OverloadController
+from .planner import Planner, heuristic_plan, likely_needs_tools
 from .policy import clip_reply, enforce_policy
 from .prompts import (
     build_response_system_prompt,
     build_response_user_prompt,
 )
 from .tools import ToolRegistry
-from .types import IncomingMessage, ToolResult
+from .types import IncomingMessage, PlannedAction, ToolResult
 
 logger = logging.getLogger(__name__)
 
 NAME_RE = re.compile(r"\bmy name is\s+([A-Za-z][A-Za-z\- ]{1,40})\b", re.IGNORECASE)
 CITY_RE = re.compile(r"\bi live in\s+([A-Za-z][A-Za-z\- ]{1,40})\b", re.IGNORECASE)
 
+BUSY_REPLY = "I'm handling a lot of messages right now. Please ask again in a few minutes."
+MAX_DEFERRED_MESSAGES = 5000
+
+
+@dataclass(slots=True)
+class SpeculationStats:
+    attempted: int = 0
+    accepted: int = 0
+    discarded: int = 0
+    saved_s: float = 0.0
+
+    @property
+    def acceptance_rate(self) -> float:
+        return self.accepted / self.attempted if self.attempted else 0.0
+
+    def summary(self) -> str:
+        avg_saved_ms = (self.saved_s / self.accepted) * 1000.0 if self.accepted else 0.0
+        return (
+            f"attempted={self.attempted} accepted={self.accepted} discarded={self.discarded} "
+            f"acceptance={self.acceptance_rate:.0%} avg_saved={avg_saved_ms:.0f}ms"
+        )
+
 
 class AgentRuntime:
     def __init__(
@@ -28,51 +56,112 @@ class AgentRuntime:
         memory: MemoryStore,
         llm: LLMClient,
         planner: Planner,
+        router: ModelRouter,
+        overload: OverloadController,
+        admission: AdmissionController,
         tools: ToolRegistry,
         agent_name: str,
         max_context_messages: int,
         max_reply_chars: int,
+        speculate: bool = True,
     ) -> None:
         self._memory = memory
         self._llm = llm
         self._planner = planner
+        self._router = router
+        self._overload = overload
+        self._admission = admission
         self._tools = tools
         self._agent_name = agent_name
         self._max_context_messages = max_context_messages
         self._max_reply_chars = max_reply_chars
-        self._queue: asyncio.Queue[IncomingMessage] = asyncio.Queue(maxsize=200)
+        self._queue: asyncio.Queue[tuple[IncomingMessage, float]] = asyncio.Queue(maxsize=200)
+        # Enqueue times of the queued messages, oldest first, for backlog_age_s().
+        self._enqueued_at: deque[float] = deque()
+        self._deferred: deque[IncomingMessage] = deque()
+        self._speculate = speculate
+        self.speculation = SpeculationStats()
 
     async def enqueue(self, incoming: IncomingMessage) -> None:
+        if not self._admission.admit(incoming.user_id, incoming.chat_id).admitted:
+            # Keep the history but spend no planner, LLM or fact-extraction
+            # work on it, and keep it out of the shared deferred buffer.
+            await self._save_user_message(incoming)
+            return
+        enqueued_at = time.monotonic()
         try:
-            self._queue.put_nowait(incoming)
+            self._queue.put_nowait((incoming, enqueued_at))
         except asyncio.QueueFull:
             logger.warning("queue full, dropping message %s", incoming.message_id)
+        else:
+            self._enqueued_at.append(enqueued_at)
 
-    async def worker(self, send_reply_cb) -> None:
-        while True:
-            incoming = await self._queue.get()
-            try:
-                await self._process_one(incoming, send_reply_cb)
-            except Exception:
-                logger.exception("failed processing message id=%s", incoming.message_id)
-            finally:
-                self._queue.task_done()
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
 
-    async def _process_one(self, incoming: IncomingMessage, send_reply_cb) -> None:
-        if await self._memory.is_processed(incoming.chat_id, incoming.message_id):
-            return
+    def backlog_age_s(self) -> float:
+        """Seconds the oldest queued message has waited; 0 when the queue is empty."""
+        if not self._enqueued_at:
+            return 0.0
+        return time.monotonic() - self._enqueued_at[0]
 
-        await self._memory.mark_processed(incoming.chat_id, incoming.message_id)
+    def take_nowait(self) -> tuple[IncomingMessage, float] | None:
+        try:
+            item = self._queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+        self._enqueued_at.popleft()
+        return item
+
+    async def handle(self, incoming: IncomingMessage, enqueued_at: float, send_reply_cb) -> None:
+        """Process one dequeued message; exceptions are logged, not raised."""
+        self._overload.observe_queue_wait(time.monotonic() - enqueued_at)
+        try:
+            await self._process_one(incoming, send_reply_cb)
+            if self._deferred and self._overload.level < DegradationLevel.DEFER_PERSISTENCE:
+                await self.flush_deferred()
+        except Exception:
+            logger.exception("failed processing message id=%s", incoming.message_id)
+        finally:
+            self._queue.task_done()
+
+    async def flush_deferred(self) -> None:
+        while self._deferred:
+            await self._persist_user_message(self._deferred.popleft())
+
+    async def _persist_user_message(self, incoming: IncomingMessage) -> None:
+        await self._save_user_message(incoming)
+        await self._extract_profile_facts(incoming)
+
+    async def _save_user_message(self, incoming: IncomingMessage) -> None:
         await self._memory.add_message(
             chat_id=incoming.chat_id,
             user_id=incoming.user_id,
             role="user",
             text=incoming.text,
             meta={"sender_name": incoming.sender_name, "message_id": incoming.message_id},
+            created_at_us=datetime_to_us(incoming.created_at),
         )
-        await self._extract_profile_facts(incoming)
 
+    def _defer_persistence(self, incoming: IncomingMessage) -> None:
+        if len(self._deferred) >= MAX_DEFERRED_MESSAGES:
+            dropped = self._deferred.popleft()
+            logger.warning("deferred buffer full, dropping history for message %s", dropped.message_id)
+        self._deferred.append(incoming)
+
+    async def _process_one(self, incoming: IncomingMessage, send_reply_cb) -> None:
+        if await self._memory.is_processed(incoming.chat_id, incoming.message_id):
+            return
+
+        await self._memory.mark_processed(incoming.chat_id, incoming.message_id)
+        level = self._overload.level
         policy = enforce_policy(incoming.text, max_chars=self._max_reply_chars)
+        if policy.allowed and not policy.should_reply and level >= DegradationLevel.DEFER_PERSISTENCE:
+            self._defer_persistence(incoming)
+            return
+        await self._persist_user_message(incoming)
+
         if not policy.allowed:
             if policy.reason == "high_risk_content":
                 await send_reply_cb(
@@ -84,33 +173,87 @@ class AgentRuntime:
         if not policy.should_reply:
             return
 
-        recent = await self._memory.get_recent_messages(incoming.chat_id, self._max_context_messages)
-        context_lines = [f"{m.role}: {m.text}" for m in recent]
-        facts = await self._memory.get_profile_facts(incoming.user_id, limit=8)
+        if level >= DegradationLevel.BUSY_REPLY:
+            await send_reply_cb(incoming.chat_id, BUSY_REPLY)
+            return
 
-        plan = await self._planner.plan(
-            sender_name=incoming.sender_name,
-            text=incoming.text,
-            context_lines=context_lines,
+        context_limit = self._max_context_messages
+        if level >= DegradationLevel.SHRINK_CONTEXT:
+            context_limit = max(3, context_limit // 4)
+        recent, facts = await asyncio.gather(
+            self._memory.get_recent_messages(incoming.chat_id, context_limit),
+            self._memory.get_profile_facts(incoming.user_id, limit=8),
         )
+        context_lines = [f"{m.role}: {m.text}" for m in recent]
+
+        speculative: asyncio.Task[tuple[str, float]] | None = None
+        speculative_route: ModelRoute | None = None
+        started = time.monotonic()
+        if level >= DegradationLevel.HEURISTIC_PLAN:
+            plan = heuristic_plan(incoming.text)
+        else:
+            # Speculation runs on the strong route, so skip messages the plan
+            # may still send to the fast model (short chit-chat).
+            if (
+                self._speculate
+                and level == DegradationLevel.NORMAL
+                and not likely_needs_tools(incoming.text)
+                and not self._router.may_route_fast(incoming.text)
+            ):
+                provisional = heuristic_plan(incoming.text)
+                speculative_route = self._router.response_route(provisional, incoming.text)
+                speculative = asyncio.create_task(
+                    self._timed(
+                        self._generate_reply(incoming.text, context_lines, [], facts, provisional, speculative_route)
+                    )
+                )
+                self.speculation.attempted += 1
+            try:
+                plan = await self._planner.plan(
+                    sender_name=incoming.sender_name,
+                    text=incoming.text,
+                    context_lines=context_lines,
+                )
+            except BaseException:
+                if speculative is not None:
+                    speculative.cancel()
+                    await asyncio.gather(speculative, return_exceptions=True)
+                raise
+            self._overload.observe_llm_latency(time.monotonic() - started)
+        planned_at = time.monotonic()
+
+        if speculative is not None and not self._speculation_matches(
+            plan, provisional, speculative_route, incoming.text
+        ):
+            speculative.cancel()
+            await asyncio.gather(speculative, return_exceptions=True)
+            speculative = None
+            self.speculation.discarded += 1
         if not plan.should_reply or plan.confidence < 0.25:
             return
 
         tool_results = await self._run_tools(plan.tool_calls, incoming.user_id)
         tool_output_lines = [f"{r.name}: {r.output}" for r in tool_results]
 
-        response = await self._llm.generate_text(
-            system_prompt=build_response_system_prompt(self._agent_name),
-            user_prompt=build_response_user_prompt(
-                message_text=incoming.text,
-                context_lines=context_lines,
-                tool_outputs=tool_output_lines,
-                profile_facts=facts,
-                intent=plan.intent,
-                style=plan.reply_style,
-            ),
-            temperature=0.3,
-        )
+        response: str | None = None
+        if speculative is not None:
+            assert speculative_route is not None
+            try:
+                response, generation_s = await speculative
+            except Exception:
+                logger.warning("speculative reply failed for message %s; regenerating", incoming.message_id)
+                self.speculation.discarded += 1
+            else:
+                route = speculative_route
+                self._record_speculation_hit(planned_at - started, generation_s, incoming.message_id)
+        if response is None:
+            if level >= DegradationLevel.CHEAP_MODEL:
+                route = self._router.fast_route
+            else:
+                route = self._router.response_route(plan, incoming.text)
+            response = await self._generate_reply(
+                incoming.text, context_lines, tool_output_lines, facts, plan, route
+            )
         response = clip_reply(response.strip(), self._max_reply_chars)
         if not response:
             return
@@ -126,9 +269,66 @@ class AgentRuntime:
                 "confidence": plan.confidence,
                 "rationale": plan.rationale,
                 "tools": [r.name for r in tool_results],
+                "model_route": route.name,
+                "degradation_level": int(level),
             },
         )
 
+    async def _generate_reply(
+        self,
+        message_text: str,
+        context_lines: list[str],
+        tool_output_lines: list[str],
+        facts: list[str],
+        plan: PlannedAction,
+        route: ModelRoute,
+    ) -> str:
+        started = time.monotonic()
+        response = await self._llm.generate_text(
+            system_prompt=build_response_system_prompt(self._agent_name),
+            user_prompt=build_response_user_prompt(
+                message_text=message_text,
+                context_lines=context_lines,
+                tool_outputs=tool_output_lines,
+                profile_facts=facts,
+                intent=plan.intent,
+                style=plan.reply_style,
+            ),
+            temperature=0.3,
+            model=route.model,
+            route=route.name,
+        )
+        self._overload.observe_llm_latency(time.monotonic() - started)
+        return response
+
+    def _speculation_matches(
+        self,
+        plan: PlannedAction,
+        provisional: PlannedAction,
+        speculative_route: ModelRoute | None,
+        message_text: str,
+    ) -> bool:
+        """Whether the speculative reply is what the real plan would have produced."""
+        if not plan.should_reply or plan.confidence < 0.25 or plan.tool_calls:
+            return False
+        if plan.intent != provisional.intent or plan.reply_style != provisional.reply_style:
+            return False
+        return self._router.response_route(plan, message_text) == speculative_route
+
+    @staticmethod
+    async def _timed(coro: Awaitable[str]) -> tuple[str, float]:
+        started = time.monotonic()
+        result = await coro
+        return result, time.monotonic() - started
+
+    def _record_speculation_hit(self, planning_s: float, generation_s: float, message_id: int) -> None:
+        # Run in sequence the two calls would cost planning_s + generation_s;
+        # overlapped they cost the longer of the two.
+        saved = min(planning_s, generation_s)
+        self.speculation.accepted += 1
+        self.speculation.saved_s += saved
+        logger.debug("speculative reply accepted for message %s, saved %.0f ms", message_id, saved * 1000.0)
+
     async def _run_tools(self, tool_calls: list[dict], user_id: int) -> list[ToolResult]:
         results: list[ToolResult] = []
         for call in tool_calls:
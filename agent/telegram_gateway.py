@@ -3,19 +3,29 @@ from __future__ import annotations
 import asyncio
 import logging
 from collections.abc import Awaitable, Callable
+from pathlib import Path
 
 from telethon import TelegramClient, events
 
+from .media import VoicePipeline
 from .types import IncomingMessage
 
 logger = logging.getLogger(__name__)
 
 
 class TelegramGateway:
-    def __init__(self, api_id: int, api_hash: str, session_name: str) -> None:
+    def __init__(
+        self,
+        api_id: int,
+        api_hash: str,
+        session_name: str,
+        voice: VoicePipeline | None = None,
+    ) -> None:
         self._client = TelegramClient(session_name, api_id, api_hash)
         self._on_message: Callable[[IncomingMessage], Awaitable[None]] | None = None
         self._lock = asyncio.Lock()
+        self._voice = voice
+        self._voice_tasks: set[asyncio.Task[None]] = set()
 
     def register_handler(self, callback: Callable[[IncomingMessage], Awaitable[None]]) -> None:
         self._on_message = callback
@@ -41,9 +51,32 @@ class TelegramGateway:
                 sender_name=sender_name or (getattr(sender, "username", "") or "Unknown"),
                 text=text,
             )
+            if not text and self._voice is not None and event.message.voice is not None:
+                # Download and transcription can take seconds; finish them in
+                # the background so the update handler returns immediately.
+                task = asyncio.create_task(self._dispatch_voice(event.message, incoming))
+                self._voice_tasks.add(task)
+                task.add_done_callback(self._voice_tasks.discard)
+                return
             if self._on_message is not None:
                 await self._on_message(incoming)
 
+    async def _dispatch_voice(self, message, incoming: IncomingMessage) -> None:
+        assert self._voice is not None
+
+        async def download(path: Path) -> None:
+            await self._client.download_media(message, file=str(path))
+
+        try:
+            text = await self._voice.transcribe(message.document.id, message.file.duration, download)
+        except Exception:
+            logger.exception("voice transcription failed for message id=%s", incoming.message_id)
+            return
+        if not text or self._on_message is None:
+            return
+        incoming.text = text
+        await self._on_message(incoming)
+
     async def run(self) -> None:
         await self._client.run_until_disconnected()
 
@@ -52,4 +85,7 @@ class TelegramGateway:
             await self._client.send_message(entity=chat_id, message=text)
 
     async def close(self) -> None:
+        for task in list(self._voice_tasks):
+            task.cancel()
+        await asyncio.gather(*self._voice_tasks, return_exceptions=True)
         await self._client.disconnect()
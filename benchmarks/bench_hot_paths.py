@@ -0,0 +1,225 @@
+"""Micro-benchmarks for the pipeline's CPU hot paths with stored baselines.
+
+Usage:
+    python -m benchmarks.bench_hot_paths                 # compare with baseline
+    python -m benchmarks.bench_hot_paths --save          # record a new baseline
+    python -m benchmarks.bench_hot_paths --only policy   # run matching cases
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+
+from agent.llm import LLMClient
+from agent.memory import MemoryStore
+from agent.policy import enforce_policy
+from agent.prompts import build_planner_user_prompt, build_response_user_prompt
+from agent.tools import safe_calculate
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+MAX_MESSAGE_CHARS = 5000
+CONTEXT_MESSAGES = 25
+
+_WORDS = "could you please explain how the scheduler handles retries when the upstream times out".split()
+
+
+def _text(chars: int, *, suffix: str = "") -> str:
+    body = " ".join(_WORDS[i % len(_WORDS)] for i in range(chars // 4))
+    return (body[: chars - len(suffix)] + suffix)[:chars]
+
+
+LONG_QUESTION = _text(MAX_MESSAGE_CHARS, suffix=" why?")
+LONG_STATEMENT = _text(MAX_MESSAGE_CHARS).replace("how", "now").replace("explain", "mention").replace("could you", "we did")
+LONG_HIGH_RISK = _text(MAX_MESSAGE_CHARS - 20) + " private key leak"
+CONTEXT_LINES = [
+    f"{'user' if i % 2 == 0 else 'assistant'}: {_text(400)}" for i in range(CONTEXT_MESSAGES)
+]
+PROFILE_FACTS = [f"fact_{i}: value {i} (conf=0.80)" for i in range(8)]
+TOOL_OUTPUTS = ["now_time: UTC time: 2024-05-01T10:00:00+00:00", "calculator: (3 + 4) * 12 / 7 = 12.0"]
+
+PLAN_JSON = json.dumps(
+    {
+        "should_reply": True,
+        "intent": "general_question",
+        "confidence": 0.82,
+        "reply_style": "clear_direct",
+        "tool_calls": [{"name": "now_time", "args": {}}],
+        "rationale": "user asks for an explanation",
+    }
+)
+PLAN_IN_PROSE = f"Sure! Here is the plan you asked for:\n{PLAN_JSON}\nLet me know if you need anything else."
+PLAN_GARBAGE = "I think we should reply, with moderate confidence, but no JSON here { not really."
+
+
+@dataclass(slots=True)
+class Case:
+    name: str
+    fn: Callable[[], object] | None = None
+    afn: Callable[[], Awaitable[object]] | None = None
+    number: int = 1000
+
+
+def _fake_llm(raw: str) -> LLMClient:
+    async def create(**_: object) -> SimpleNamespace:
+        return SimpleNamespace(output_text=raw, usage=None)
+
+    llm = LLMClient(api_key="bench", model="bench")
+    llm._client = SimpleNamespace(responses=SimpleNamespace(create=create))
+    return llm
+
+
+async def _memory_store(root: Path) -> MemoryStore:
+    store = MemoryStore(root / "bench.db")
+    await store.init()
+    for i in range(500):
+        await store.add_message(
+            chat_id=1, user_id=1, role="user" if i % 2 == 0 else "assistant", text=_text(400), meta={"i": i}
+        )
+    for i in range(20):
+        await store.add_profile_fact(1, f"fact_{i}", f"value {i}", 0.8)
+    return store
+
+
+def build_cases(store: MemoryStore) -> list[Case]:
+    fallback = {"should_reply": True}
+    clean, prose, garbage = _fake_llm(PLAN_JSON), _fake_llm(PLAN_IN_PROSE), _fake_llm(PLAN_GARBAGE)
+    return [
+        Case("policy.question_5000", lambda: enforce_policy(LONG_QUESTION, max_chars=1600), number=2000),
+        Case("policy.statement_5000", lambda: enforce_policy(LONG_STATEMENT, max_chars=1600), number=2000),
+        Case("policy.high_risk_5000", lambda: enforce_policy(LONG_HIGH_RISK, max_chars=1600), number=2000),
+        Case("tools.safe_calculate", lambda: safe_calculate("(3 + 4) * 12 / 7 - 2 ** 5 % 3"), number=5000),
+        Case(
+            "prompts.planner_25ctx",
+            lambda: build_planner_user_prompt("Orion", "Ann", LONG_QUESTION, CONTEXT_LINES),
+            number=50000,
+        ),
+        Case(
+            "prompts.response_25ctx",
+            lambda: build_response_user_prompt(
+                LONG_QUESTION, CONTEXT_LINES, TOOL_OUTPUTS, PROFILE_FACTS, "general_question", "clear_direct"
+            ),
+            number=50000,
+        ),
+        Case("llm.generate_json_clean", afn=lambda: clean.generate_json("s", "u", fallback=fallback), number=2000),
+        Case("llm.generate_json_prose", afn=lambda: prose.generate_json("s", "u", fallback=fallback), number=2000),
+        Case(
+            "llm.generate_json_fallback",
+            afn=lambda: garbage.generate_json("s", "u", fallback=fallback),
+            number=2000,
+        ),
+        Case(
+            "memory.add_message",
+            afn=lambda: store.add_message(chat_id=2, user_id=2, role="user", text=_text(400), meta={}),
+            number=100,
+        ),
+        Case("memory.get_recent_25", afn=lambda: store.get_recent_messages(1, CONTEXT_MESSAGES), number=200),
+        Case("memory.get_profile_facts", afn=lambda: store.get_profile_facts(1, limit=8), number=200),
+    ]
+
+
+async def _time_case(case: Case, repeat: int, scale: float) -> float:
+    """Best-of-``repeat`` seconds per call; the minimum is least affected by noise."""
+    number = max(1, int(case.number * scale))
+    batches: list[float] = []
+    for _ in range(repeat):
+        if case.fn is not None:
+            fn = case.fn
+            t0 = time.perf_counter()
+            for _ in range(number):
+                fn()
+        else:
+            assert case.afn is not None
+            afn = case.afn
+            t0 = time.perf_counter()
+            for _ in range(number):
+                await afn()
+        batches.append((time.perf_counter() - t0) / number)
+    return min(batches)
+
+
+async def run_suite(*, only: str | None = None, repeat: int = 7, scale: float = 1.0) -> dict[str, float]:
+    # The fallback case logs a warning per call; keep logging out of the timings.
+    llm_logger = logging.getLogger("agent.llm")
+    previous_level = llm_logger.level
+    llm_logger.setLevel(logging.ERROR)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = await _memory_store(Path(tmp))
+            results: dict[str, float] = {}
+            try:
+                for case in build_cases(store):
+                    if only and only not in case.name:
+                        continue
+                    results[case.name] = await _time_case(case, repeat, scale)
+            finally:
+                await store.close()
+            return results
+    finally:
+        llm_logger.setLevel(previous_level)
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float) -> tuple[str, list[str]]:
+    lines = [f"{'case':<30} {'baseline':>12} {'current':>12} {'delta':>8}"]
+    regressions: list[str] = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            lines.append(f"{name:<30} {'-':>12} {current * 1e6:>10.2f}us {'new':>8}")
+            continue
+        delta = (current - base) / base
+        flag = ""
+        if delta > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        lines.append(f"{name:<30} {base * 1e6:>10.2f}us {current * 1e6:>10.2f}us {delta:>+7.1%}{flag}")
+    return "\n".join(lines), regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the pipeline's CPU hot paths.")
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--only", help="run only cases whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply per-case iteration counts")
+    parser.add_argument("--threshold", type=float, default=0.20, help="relative slowdown reported as regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run_suite(only=args.only, repeat=args.repeat, scale=args.scale))
+
+    if args.save:
+        payload = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seconds_per_call": {name: round(value, 9) for name, value in results.items()},
+        }
+        args.baseline.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+        print(f"saved {len(results)} cases to {args.baseline}")
+        return 0
+
+    baseline: dict[str, float] = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["seconds_per_call"]
+    report, regressions = compare(results, baseline, args.threshold)
+    print(report)
+    if regressions:
+        print(f"\n{len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""Recent-history read latency at millions of rows.
+
+Usage: python -m benchmarks.bench_recent_history [--rows 2000000] [--chats 5000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from agent.memory import MemoryStore, now_us
+
+RECENT_SQL = """
+SELECT role, text, created_at
+FROM messages
+WHERE chat_id=?
+ORDER BY id DESC
+LIMIT ?
+"""
+
+
+def _populate(db_path: Path, rows: int, chats: int) -> None:
+    rng = random.Random(42)
+    base = now_us() - rows * 1000
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous=OFF")
+    batch = []
+    for i in range(rows):
+        batch.append(
+            (
+                rng.randrange(chats),
+                rng.randrange(chats),
+                "user" if i % 2 == 0 else "assistant",
+                "message body " * rng.randint(1, 20),
+                "{}",
+                base + i * 1000,
+            )
+        )
+        if len(batch) == 50_000:
+            conn.executemany(
+                "INSERT INTO messages(chat_id, user_id, role, text, meta_json, created_at) VALUES(?, ?, ?, ?, ?, ?)",
+                batch,
+            )
+            batch.clear()
+    if batch:
+        conn.executemany(
+            "INSERT INTO messages(chat_id, user_id, role, text, meta_json, created_at) VALUES(?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def _report(label: str, samples: list[float]) -> None:
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<28} p50={statistics.median(samples) * 1e3:8.3f} ms  p95={p95 * 1e3:8.3f} ms")
+
+
+async def _run(rows: int, chats: int, reads: int, limit: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        store = MemoryStore(db_path)
+        await store.init()
+
+        started = time.perf_counter()
+        _populate(db_path, rows, chats)
+        print(f"populated {rows:,} rows over {chats:,} chats in {time.perf_counter() - started:.1f}s")
+
+        conn = sqlite3.connect(db_path)
+        for row in conn.execute("EXPLAIN QUERY PLAN " + RECENT_SQL, (0, limit)):
+            print(f"plan: {row[-1]}")
+
+        rng = random.Random(7)
+        raw: list[float] = []
+        for _ in range(reads):
+            chat_id = rng.randrange(chats)
+            t0 = time.perf_counter()
+            conn.execute(RECENT_SQL, (chat_id, limit)).fetchall()
+            raw.append(time.perf_counter() - t0)
+        conn.close()
+        _report("query (warm connection)", raw)
+
+        via_store: list[float] = []
+        for _ in range(reads):
+            chat_id = rng.randrange(chats)
+            t0 = time.perf_counter()
+            await store.get_recent_messages(chat_id, limit)
+            via_store.append(time.perf_counter() - t0)
+        _report("MemoryStore.get_recent", via_store)
+        await store.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--chats", type=int, default=5_000)
+    parser.add_argument("--reads", type=int, default=2_000)
+    parser.add_argument("--limit", type=int, default=25)
+    args = parser.parse_args()
+    asyncio.run(_run(args.rows, args.chats, args.reads, args.limit))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+from agent import admission
+from agent.admission import AdmissionController
+
+
+def test_admission_limits_bursts_per_user():
+    controller = AdmissionController(user_rate_per_min=0.001, user_burst=3, chat_rate_per_min=600, chat_burst=100)
+    decisions = [controller.admit(user_id=1, chat_id=1).admitted for _ in range(5)]
+
+    assert decisions == [True, True, True, False, False]
+    assert controller.admit(user_id=2, chat_id=2).admitted
+    assert (controller.usage[1].admitted, controller.usage[1].limited) == (3, 2)
+
+
+def test_admission_chat_limit_does_not_drain_user_bucket():
+    controller = AdmissionController(user_rate_per_min=0.001, user_burst=2, chat_rate_per_min=0.001, chat_burst=1)
+
+    assert controller.admit(user_id=1, chat_id=1).admitted
+    assert controller.admit(user_id=1, chat_id=1).reason == "chat_rate_limited"
+    assert controller.admit(user_id=1, chat_id=2).admitted
+
+
+def test_admission_allow_list_bypasses_limits():
+    controller = AdmissionController(
+        user_rate_per_min=0.001, user_burst=1, chat_rate_per_min=0.001, chat_burst=1, allow_list={7}
+    )
+
+    assert all(controller.admit(user_id=7, chat_id=7).admitted for _ in range(20))
+
+
+def test_admission_evicts_least_recently_active_users(monkeypatch):
+    monkeypatch.setattr(admission, "MAX_TRACKED_USERS", 2)
+    monkeypatch.setattr(admission, "MAX_TRACKED_BUCKETS", 2)
+    controller = AdmissionController(user_rate_per_min=0.001, user_burst=1, chat_rate_per_min=600, chat_burst=100)
+
+    assert controller.admit(user_id=1, chat_id=1).admitted
+    assert controller.admit(user_id=2, chat_id=1).admitted
+    assert not controller.admit(user_id=1, chat_id=1).admitted
+    assert controller.admit(user_id=3, chat_id=1).admitted
+
+    assert list(controller.usage) == [1, 3]
+    assert list(controller._user_buckets) == [1, 3]
+    # User 1 stayed active, so its drained bucket was kept.
+    assert not controller.admit(user_id=1, chat_id=1).admitted
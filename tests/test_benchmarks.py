@@ -0,0 +1,36 @@
+import logging
+
+from benchmarks.bench_hot_paths import (
+    LONG_HIGH_RISK,
+    LONG_QUESTION,
+    LONG_STATEMENT,
+    MAX_MESSAGE_CHARS,
+    compare,
+    run_suite,
+)
+from agent.policy import enforce_policy
+
+
+def test_policy_inputs_exercise_intended_paths():
+    assert all(len(t) <= MAX_MESSAGE_CHARS for t in (LONG_QUESTION, LONG_STATEMENT, LONG_HIGH_RISK))
+    assert enforce_policy(LONG_QUESTION, max_chars=1600).reason == "ok"
+    assert enforce_policy(LONG_STATEMENT, max_chars=1600).reason == "not_a_question"
+    assert enforce_policy(LONG_HIGH_RISK, max_chars=1600).reason == "high_risk_content"
+
+
+async def test_every_benchmark_case_runs():
+    llm_logger = logging.getLogger("agent.llm")
+    llm_logger.setLevel(logging.INFO)
+    try:
+        results = await run_suite(repeat=1, scale=0.001)
+        assert llm_logger.level == logging.INFO
+    finally:
+        llm_logger.setLevel(logging.NOTSET)
+    assert len(results) == 12
+    assert all(value > 0 for value in results.values())
+
+
+def test_compare_flags_regressions():
+    report, regressions = compare({"a": 2.0, "b": 1.0, "c": 1.0}, {"a": 1.0, "b": 1.0}, threshold=0.2)
+    assert regressions == ["a"]
+    assert "REGRESSION" in report and "new" in report
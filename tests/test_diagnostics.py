@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+from agent.diagnostics import LoopLagMonitor, SamplingProfiler
+
+
+def _blocking_work(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+async def test_loop_lag_monitor_reports_blocking_stack(caplog):
+    monitor = LoopLagMonitor(threshold_ms=100, interval_ms=20)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    _blocking_work(0.4)
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    assert monitor.stall_count >= 1
+    assert "_blocking_work" in caplog.text
+
+
+async def test_sampling_profiler_writes_folded_stacks(tmp_path):
+    profiler = SamplingProfiler(output_dir=tmp_path, interval_ms=1)
+    profiler.start()
+    _blocking_work(0.1)
+    path = profiler.stop()
+
+    assert path is not None
+    assert "_blocking_work" in path.read_text(encoding="utf-8")
+
+
+async def test_profiler_toggle_does_not_block_and_dumps_from_sampler_thread(tmp_path):
+    profiler = SamplingProfiler(output_dir=tmp_path, interval_ms=1)
+    profiler.toggle()
+    _blocking_work(0.05)
+    profiler.toggle()
+
+    assert not profiler.running
+    for _ in range(200):
+        if profiler.last_dump is not None:
+            break
+        await asyncio.sleep(0.01)
+    assert profiler.last_dump is not None
+    assert "_blocking_work" in profiler.last_dump.read_text(encoding="utf-8")
@@ -0,0 +1,92 @@
+import io
+import json
+
+import pytest
+
+from agent.app import main
+from agent.export import (
+    ExportFilter,
+    build_report,
+    connect_readonly,
+    iter_facts,
+    iter_meta,
+    write_jsonl,
+    write_parquet,
+)
+from agent.memory import MemoryStore
+
+
+async def _seed(tmp_path):
+    store = MemoryStore(tmp_path / "agent.db")
+    await store.init()
+    for chat_id in (1, 2):
+        await store.add_message(chat_id=chat_id, user_id=chat_id, role="user", text="what time is it?", meta={})
+        await store.add_message(
+            chat_id=chat_id,
+            user_id=chat_id,
+            role="assistant",
+            text="noon",
+            meta={"intent": "time_query", "confidence": 0.9, "tools": ["now_time"], "model_route": "respond_fast"},
+        )
+    await store.add_message(chat_id=1, user_id=1, role="user", text="thanks", meta={})
+    await store.close()
+    return store.db_path
+
+
+async def test_export_jsonl_streams_in_chunks_with_chat_filter(tmp_path):
+    conn = connect_readonly(await _seed(tmp_path))
+    out = io.StringIO()
+    count = write_jsonl(iter_meta(conn, ExportFilter(chat_id=2), chunk_size=1), out)
+    conn.close()
+
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert count == 1
+    assert rows[0]["intent"] == "time_query"
+    assert rows[0]["tools"] == ["now_time"]
+    assert rows[0]["created_at"].endswith("+00:00")
+
+
+async def test_export_facts_maps_chat_filter_to_user(tmp_path):
+    store = MemoryStore(tmp_path / "agent.db")
+    await store.init()
+    await store.add_profile_fact(1, "city", "Tashkent", 0.8)
+    await store.add_profile_fact(2, "city", "Samarkand", 0.8)
+    await store.close()
+
+    conn = connect_readonly(store.db_path)
+    rows = [row for chunk in iter_facts(conn, ExportFilter(chat_id=1)) for row in chunk]
+    conn.close()
+
+    assert [(r["user_id"], r["fact_value"]) for r in rows] == [(1, "Tashkent")]
+
+
+async def test_report_aggregates_in_one_pass(tmp_path):
+    conn = connect_readonly(await _seed(tmp_path))
+    report = build_report(conn, ExportFilter(), chunk_size=2).as_dict()
+    conn.close()
+
+    assert report["chats"] == 2
+    assert report["user_messages"] == 3
+    assert report["assistant_messages"] == 2
+    assert report["reply_rate"] == round(2 / 3, 4)
+    assert report["intent_mix"] == {"time_query": 2}
+    assert report["tool_usage"] == {"now_time": 2}
+
+
+async def test_export_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    conn = connect_readonly(await _seed(tmp_path))
+    path = tmp_path / "meta.parquet"
+    count = write_parquet("meta", iter_meta(conn, ExportFilter(), chunk_size=1), path)
+    conn.close()
+
+    assert count == 2
+    assert pq.read_table(path).column("intent").to_pylist() == ["time_query", "time_query"]
+
+
+def test_invalid_since_is_a_usage_error(capsys):
+    with pytest.raises(SystemExit) as exc:
+        main(["report", "--since", "notadate"])
+
+    assert exc.value.code == 2
+    assert "not an ISO-8601 date" in capsys.readouterr().err
@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+import pytest
+
+from agent.config import Settings, load_accounts
+from agent.hosting import FairWorkerPool, HostedAccount
+from agent.llm import LLMClient, usage_scope
+from agent.memory import DatabaseWriter
+from agent.types import IncomingMessage
+
+
+class _StubRuntime:
+    def __init__(self, name, served):
+        self._name = name
+        self._served = served
+        self._queue = []
+
+    @property
+    def pending(self):
+        return len(self._queue)
+
+    async def enqueue(self, incoming):
+        self._queue.append((incoming, 0.0))
+
+    def take_nowait(self):
+        return self._queue.pop(0) if self._queue else None
+
+    async def handle(self, incoming, enqueued_at, send_reply_cb):
+        self._served.append((self._name, usage_scope.get()))
+        await asyncio.sleep(0)
+
+
+async def test_pool_serves_accounts_round_robin(tmp_path):
+    served = []
+    writer = DatabaseWriter()
+    pool = FairWorkerPool(llm=LLMClient(api_key="test", model="m"), writer=writer)
+    accounts = {}
+    for name in ("busy", "quiet"):
+        accounts[name] = HostedAccount(
+            name=name, runtime=_StubRuntime(name, served), send_reply=None, db_path=tmp_path / f"{name}.db"
+        )
+        pool.add_account(accounts[name])
+
+    for i in range(6):
+        await pool.handler_for(accounts["busy"])(IncomingMessage(i, 1, 1, "B", "?"))
+    for i in range(2):
+        await pool.handler_for(accounts["quiet"])(IncomingMessage(i, 2, 2, "Q", "?"))
+
+    worker = asyncio.create_task(pool.worker())
+    while len(served) < 8:
+        await asyncio.sleep(0)
+    worker.cancel()
+    await asyncio.gather(worker, return_exceptions=True)
+    await writer.close()
+
+    assert [name for name, _ in served[:4]] == ["busy", "quiet", "busy", "quiet"]
+    assert all(name == scope for name, scope in served)
+    report = pool.resource_report()
+    assert report["busy"]["processed"] == 6
+    assert report["quiet"]["processed"] == 2
+
+
+def _settings(tmp_path, accounts_file=None):
+    return Settings(
+        TG_API_ID=1,
+        TG_API_HASH="hash",
+        OPENAI_API_KEY="key",
+        SESSION_NAME=str(tmp_path / "default.session"),
+        DB_PATH=tmp_path / "default.db",
+        ACCOUNTS_FILE=accounts_file,
+    )
+
+
+def test_load_accounts_defaults_to_single_account(tmp_path):
+    (account,) = load_accounts(_settings(tmp_path))
+    assert (account.name, account.tg_api_id, account.agent_name) == ("default", 1, "Orion")
+
+
+def test_load_accounts_requires_separate_databases(tmp_path):
+    path = tmp_path / "accounts.json"
+    path.write_text(
+        json.dumps(
+            [
+                {"name": "a", "session_name": str(tmp_path / "a.session"), "db_path": str(tmp_path / "same.db")},
+                {"name": "b", "session_name": str(tmp_path / "b.session"), "db_path": str(tmp_path / "same.db")},
+            ]
+        )
+    )
+    with pytest.raises(ValueError):
+        load_accounts(_settings(tmp_path, path))
+
+
+def test_load_accounts_rejects_missing_credentials(tmp_path):
+    settings = _settings(tmp_path)
+    settings.tg_api_hash = ""
+    with pytest.raises(ValueError, match="tg_api_hash"):
+        load_accounts(settings)
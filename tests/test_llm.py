@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+from agent.llm import LLMClient, ModelRouter
+from agent.types import PlannedAction
+
+
+def _plan(intent: str, confidence: float) -> PlannedAction:
+    return PlannedAction(
+        should_reply=True,
+        intent=intent,
+        confidence=confidence,
+        reply_style="clear_direct",
+        tool_calls=[],
+        rationale="",
+    )
+
+
+def _router() -> ModelRouter:
+    return ModelRouter(
+        planner_model="planner-m",
+        fast_model="fast-m",
+        strong_model="strong-m",
+        fast_intents={"time_query", " Small_Talk "},
+        fast_max_chars=100,
+        fast_min_confidence=0.7,
+    )
+
+
+def test_router_sends_simple_confident_intents_to_fast_model():
+    route = _router().response_route(_plan("small_talk", 0.9), "what time is it?")
+    assert (route.name, route.model) == ("respond_fast", "fast-m")
+
+
+def test_router_falls_back_to_strong_model():
+    router = _router()
+    assert router.response_route(_plan("time_query", 0.5), "time?").model == "strong-m"
+    assert router.response_route(_plan("complex_reasoning", 0.95), "why?").model == "strong-m"
+    assert router.response_route(_plan("time_query", 0.95), "x" * 101).model == "strong-m"
+
+
+class _FakeResponses:
+    async def create(self, **kwargs):
+        self.last_model = kwargs["model"]
+        return SimpleNamespace(output_text='{"ok": true}', usage=SimpleNamespace(input_tokens=11, output_tokens=3))
+
+
+async def test_llm_client_records_usage_per_route():
+    client = LLMClient(api_key="test", model="default-m")
+    fake = _FakeResponses()
+    client._client = SimpleNamespace(responses=fake)
+
+    payload = await client.generate_json("s", "u", fallback={}, model="planner-m", route="planner")
+
+    assert payload == {"ok": True}
+    assert fake.last_model == "planner-m"
+    usage = client.usage["planner"]
+    assert (usage.calls, usage.input_tokens, usage.output_tokens) == (1, 11, 3)
@@ -0,0 +1,65 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from agent.media import TranscriptionPool, VoicePipeline
+from agent.memory import MemoryStore
+
+
+def fake_transcriber(audio_path: str, model: str) -> str:
+    return f"{model}: {Path(audio_path).read_text()}"
+
+
+async def test_voice_pipeline_transcribes_off_loop_and_caches(tmp_path):
+    memory = MemoryStore(tmp_path / "agent.db")
+    await memory.init()
+    pool = TranscriptionPool(transcriber=f"{__name__}:fake_transcriber", model="tiny", workers=1)
+    pipeline = VoicePipeline(memory=memory, pool=pool, max_duration_s=60, temp_dir=tmp_path)
+    downloads = []
+
+    async def download(path: Path) -> None:
+        downloads.append(path)
+        path.write_text("hello there")
+
+    try:
+        first, second = await asyncio.gather(
+            pipeline.transcribe(42, 3, download),
+            pipeline.transcribe(42, 3, download),
+        )
+        cached = await pipeline.transcribe(42, 3, download)
+        too_long = await pipeline.transcribe(43, 61, download)
+    finally:
+        pool.close()
+        await memory.close()
+
+    assert first == second == cached == "tiny: hello there"
+    assert too_long is None
+    assert len(downloads) == 1
+    assert not downloads[0].exists()
+
+
+async def test_cancelled_transcription_releases_waiters(tmp_path):
+    memory = MemoryStore(tmp_path / "agent.db")
+    await memory.init()
+    pool = TranscriptionPool(transcriber=f"{__name__}:fake_transcriber", model="tiny", workers=1)
+    pipeline = VoicePipeline(memory=memory, pool=pool, max_duration_s=60, temp_dir=tmp_path)
+    started = asyncio.Event()
+
+    async def stalled_download(path: Path) -> None:
+        started.set()
+        await asyncio.Event().wait()
+
+    try:
+        first = asyncio.create_task(pipeline.transcribe(7, 3, stalled_download))
+        await started.wait()
+        second = asyncio.create_task(pipeline.transcribe(7, 3, stalled_download))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        with pytest.raises(RuntimeError, match="cancelled"):
+            await asyncio.wait_for(second, timeout=2)
+        assert first.cancelled()
+    finally:
+        pool.close()
+        await memory.close()
@@ -0,0 +1,102 @@
+import sqlite3
+
+from agent.memory import SCHEMA_VERSION, DatabaseWriter, MemoryStore, iso_to_us
+
+
+def _create_legacy_db(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE processed_messages (
+            chat_id INTEGER NOT NULL,
+            message_id INTEGER NOT NULL,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY(chat_id, message_id)
+        );
+        CREATE TABLE messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            chat_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            role TEXT NOT NULL,
+            text TEXT NOT NULL,
+            meta_json TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        CREATE INDEX idx_messages_chat_created ON messages(chat_id, created_at DESC);
+        CREATE TABLE user_profile_facts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            fact_key TEXT NOT NULL,
+            fact_value TEXT NOT NULL,
+            confidence REAL NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        """
+    )
+    conn.execute(
+        "INSERT INTO messages(chat_id, user_id, role, text, meta_json, created_at) VALUES(?, ?, ?, ?, ?, ?)",
+        (1, 7, "user", "hello", "{}", "2024-05-01T10:00:00.123456+00:00"),
+    )
+    conn.execute(
+        "INSERT INTO processed_messages(chat_id, message_id, created_at) VALUES(?, ?, ?)",
+        (1, 100, "2024-05-01T10:00:00+00:00"),
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_iso_to_us_is_exact():
+    assert iso_to_us("1970-01-01T00:00:01.000001+00:00") == 1_000_001
+    assert iso_to_us("1970-01-01T00:00:00") == 0
+
+
+async def test_init_migrates_legacy_text_timestamps(tmp_path):
+    db_path = tmp_path / "agent.db"
+    _create_legacy_db(db_path)
+
+    store = MemoryStore(db_path)
+    await store.init()
+    await store.init()
+
+    assert await store.is_processed(1, 100)
+    await store.add_message(chat_id=1, user_id=7, role="assistant", text="hi", meta={})
+    recent = await store.get_recent_messages(1, limit=5)
+    assert [m.text for m in recent] == ["hello", "hi"]
+    assert recent[0].created_at == iso_to_us("2024-05-01T10:00:00.123456+00:00")
+    assert recent[1].created_at > recent[0].created_at
+    await store.close()
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT role, text, created_at FROM messages WHERE chat_id=? ORDER BY id DESC LIMIT 5",
+        (1,),
+    ).fetchall()
+    conn.close()
+    assert any("idx_messages_chat_recent" in row[-1] for row in plan)
+    assert not any("TEMP B-TREE" in row[-1] for row in plan)
+
+
+async def test_profile_facts_newest_first(tmp_path):
+    store = MemoryStore(tmp_path / "agent.db")
+    await store.init()
+    await store.add_profile_fact(7, "city", "Tashkent", 0.8)
+    await store.add_profile_fact(7, "name", "Akmal", 0.85)
+
+    assert await store.get_profile_facts(7) == ["name: Akmal (conf=0.85)", "city: Tashkent (conf=0.80)"]
+    await store.close()
+
+
+async def test_close_only_closes_own_writer(tmp_path):
+    shared = DatabaseWriter()
+    borrowing = MemoryStore(tmp_path / "a.db", writer=shared)
+    owning = MemoryStore(tmp_path / "b.db")
+    for store in (borrowing, owning):
+        await store.init()
+        await store.add_message(chat_id=1, user_id=1, role="user", text="hi", meta={})
+        await store.close()
+
+    await borrowing.add_message(chat_id=1, user_id=1, role="user", text="still open", meta={})
+    assert shared.writes[borrowing.db_path] == 2
+    assert not owning._writer._connections
+    await shared.close()
@@ -0,0 +1,69 @@
+import time
+
+from agent.overload import DegradationLevel, OverloadController
+from agent.planner import heuristic_plan
+
+
+def test_overload_escalates_one_level_per_update():
+    controller = OverloadController(queue_wait_target_s=1.0, llm_latency_target_s=10.0)
+    controller.observe_queue_wait(1.2)
+    assert controller.level == DegradationLevel.SHRINK_CONTEXT
+
+    for _ in range(10):
+        controller.observe_queue_wait(6.0)
+    assert controller.level == DegradationLevel.BUSY_REPLY
+    assert controller.snapshot()["transitions"] == 5
+
+
+def test_overload_recovers_when_signals_go_stale():
+    controller = OverloadController(
+        queue_wait_target_s=1.0,
+        llm_latency_target_s=1.0,
+        cooldown_s=0.0,
+        signal_ttl_s=0.01,
+    )
+    controller.observe_llm_latency(1.6)
+    controller.observe_llm_latency(1.6)
+    assert controller.level == DegradationLevel.HEURISTIC_PLAN
+
+    time.sleep(0.02)
+    controller.update()
+    assert controller.level == DegradationLevel.SHRINK_CONTEXT
+    controller.update()
+    assert controller.level == DegradationLevel.NORMAL
+
+
+def test_overload_stays_degraded_while_backlog_is_stuck():
+    controller = OverloadController(
+        queue_wait_target_s=1.0,
+        llm_latency_target_s=1.0,
+        cooldown_s=0.0,
+        signal_ttl_s=0.01,
+    )
+    for _ in range(10):
+        controller.observe_queue_wait(6.0)
+    assert controller.level == DegradationLevel.BUSY_REPLY
+
+    # No messages are dequeued, but the oldest queued one keeps ageing.
+    time.sleep(0.02)
+    for _ in range(6):
+        controller.observe_backlog(8.0)
+    assert controller.level == DegradationLevel.BUSY_REPLY
+    assert controller.snapshot()["backlog_age_s"] == 8.0
+
+    for _ in range(6):
+        controller.observe_backlog(0.0)
+    assert controller.level == DegradationLevel.NORMAL
+
+
+def test_overload_holds_level_during_cooldown():
+    controller = OverloadController(queue_wait_target_s=1.0, llm_latency_target_s=1.0, cooldown_s=60.0)
+    controller.observe_queue_wait(1.1)
+    controller.observe_queue_wait(0.0)
+    controller.observe_queue_wait(0.0)
+    assert controller.level == DegradationLevel.SHRINK_CONTEXT
+
+
+def test_heuristic_plan_routes_time_questions_to_clock_tool():
+    assert heuristic_plan("what time is it in Tashkent?").tool_calls == [{"name": "now_time", "args": {}}]
+    assert heuristic_plan("how do I cook plov?").tool_calls == []
@@ -0,0 +1,209 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from agent.admission import AdmissionController
+from agent.llm import LLMClient, ModelRouter
+from agent.memory import MemoryStore
+from agent.overload import DegradationLevel, OverloadController
+from agent.planner import Planner
+from agent.runtime import AgentRuntime
+from agent.tools import ToolRegistry
+from agent.types import IncomingMessage
+
+
+class _FakeResponses:
+    def __init__(self, plan: dict, delay: float = 0.05) -> None:
+        self._plan = plan
+        self._delay = delay
+        self.reply_calls = 0
+        self.reply_models: list[str] = []
+
+    async def create(self, **kwargs):
+        await asyncio.sleep(self._delay)
+        if "intent planner" in kwargs["input"][0]["content"]:
+            return SimpleNamespace(output_text=json.dumps(self._plan), usage=None)
+        self.reply_calls += 1
+        self.reply_models.append(kwargs["model"])
+        return SimpleNamespace(output_text=f"reply #{self.reply_calls}", usage=None)
+
+
+async def _noop_send(chat_id, text):
+    pass
+
+
+async def _runtime(
+    tmp_path, plan: dict, fast_intents: set[str] | None = None
+) -> tuple[AgentRuntime, _FakeResponses]:
+    memory = MemoryStore(tmp_path / "agent.db")
+    await memory.init()
+    llm = LLMClient(api_key="test", model="m")
+    fake = _FakeResponses(plan)
+    llm._client = SimpleNamespace(responses=fake)
+    router = ModelRouter(
+        planner_model="p",
+        fast_model="f",
+        strong_model="s",
+        fast_intents=fast_intents or set(),
+        fast_max_chars=280,
+        fast_min_confidence=0.7,
+    )
+    tools = ToolRegistry(memory)
+    runtime = AgentRuntime(
+        memory=memory,
+        llm=llm,
+        planner=Planner(llm, tools.allowed_tool_names, "Orion", router.planner_route),
+        router=router,
+        overload=OverloadController(queue_wait_target_s=60, llm_latency_target_s=60),
+        admission=AdmissionController(user_rate_per_min=60, user_burst=2, chat_rate_per_min=60, chat_burst=2),
+        tools=tools,
+        agent_name="Orion",
+        max_context_messages=25,
+        max_reply_chars=1600,
+    )
+    return runtime, fake
+
+
+async def test_speculative_reply_is_accepted_when_plan_needs_no_tools(tmp_path):
+    runtime, fake = await _runtime(
+        tmp_path, {"should_reply": True, "intent": "general_question", "confidence": 0.9, "tool_calls": []}
+    )
+    sent = []
+
+    async def send(chat_id, text):
+        sent.append(text)
+
+    await runtime._process_one(IncomingMessage(1, 10, 20, "Ann", "how do I cook plov?"), send)
+
+    assert sent == ["reply #1"]
+    assert fake.reply_calls == 1
+    assert (runtime.speculation.accepted, runtime.speculation.discarded) == (1, 0)
+    assert runtime.speculation.saved_s > 0
+
+
+async def test_speculative_reply_is_discarded_when_plan_calls_tools(tmp_path):
+    runtime, fake = await _runtime(
+        tmp_path,
+        {
+            "should_reply": True,
+            "intent": "general_question",
+            "confidence": 0.9,
+            "tool_calls": [{"name": "now_time", "args": {}}],
+        },
+    )
+    sent = []
+
+    async def send(chat_id, text):
+        sent.append(text)
+
+    await runtime._process_one(IncomingMessage(1, 10, 20, "Ann", "how long until new year?"), send)
+
+    assert len(sent) == 1
+    assert (runtime.speculation.accepted, runtime.speculation.discarded) == (0, 1)
+
+
+async def test_no_speculation_for_messages_that_may_route_fast(tmp_path):
+    runtime, fake = await _runtime(
+        tmp_path,
+        {
+            "should_reply": True,
+            "intent": "small_talk",
+            "confidence": 0.95,
+            "reply_style": "clear_direct",
+            "tool_calls": [],
+        },
+        fast_intents={"small_talk"},
+    )
+    sent = []
+
+    async def send(chat_id, text):
+        sent.append(text)
+
+    await runtime._process_one(IncomingMessage(1, 10, 20, "Ann", "how are you?"), send)
+
+    assert len(sent) == 1
+    assert runtime.speculation.attempted == 0
+    assert fake.reply_models == ["f"]
+
+
+async def test_speculative_reply_is_discarded_when_plan_intent_differs(tmp_path):
+    runtime, fake = await _runtime(
+        tmp_path,
+        {"should_reply": True, "intent": "how_to", "confidence": 0.95, "tool_calls": []},
+        fast_intents={"small_talk"},
+    )
+    sent = []
+
+    async def send(chat_id, text):
+        sent.append(text)
+
+    long_question = "how do I cook plov? " * 20
+    await runtime._process_one(IncomingMessage(1, 10, 20, "Ann", long_question), send)
+
+    assert len(sent) == 1
+    assert (runtime.speculation.accepted, runtime.speculation.discarded) == (0, 1)
+    assert fake.reply_models[-1] == "s"
+
+
+async def test_planner_failure_awaits_cancelled_speculation(tmp_path):
+    runtime, _ = await _runtime(tmp_path, {"should_reply": True})
+
+    async def failing_plan(**_):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("planner down")
+
+    runtime._planner.plan = failing_plan
+    tasks_before = asyncio.all_tasks()
+    with pytest.raises(RuntimeError, match="planner down"):
+        await runtime._process_one(IncomingMessage(1, 10, 20, "Ann", "how do I cook plov?"), _noop_send)
+
+    assert runtime.speculation.attempted == 1
+    assert asyncio.all_tasks() <= tasks_before
+
+
+async def test_enqueue_persists_but_does_not_queue_rate_limited_messages(tmp_path):
+    runtime, _ = await _runtime(tmp_path, {"should_reply": False})
+
+    for message_id in range(5):
+        await runtime.enqueue(IncomingMessage(message_id, 10, 20, "Spam", f"spam {message_id}?"))
+
+    assert runtime._queue.qsize() == 2
+    assert not runtime._deferred
+    recent = await runtime._memory.get_recent_messages(10, limit=10)
+    assert [m.text for m in recent] == ["spam 2?", "spam 3?", "spam 4?"]
+
+
+async def test_backlog_age_tracks_oldest_queued_message(tmp_path):
+    runtime, _ = await _runtime(tmp_path, {"should_reply": False})
+    assert runtime.backlog_age_s() == 0.0
+
+    await runtime.enqueue(IncomingMessage(1, 10, 20, "Ann", "one?"))
+    await asyncio.sleep(0.02)
+    await runtime.enqueue(IncomingMessage(2, 11, 21, "Bob", "two?"))
+    assert runtime.backlog_age_s() >= 0.02
+
+    runtime.take_nowait()
+    assert runtime.backlog_age_s() < 0.02
+    runtime.take_nowait()
+    assert runtime.backlog_age_s() == 0.0
+
+
+async def test_deferred_message_keeps_receive_order_in_context(tmp_path):
+    runtime, _ = await _runtime(
+        tmp_path, {"should_reply": True, "intent": "general_question", "confidence": 0.9, "tool_calls": []}
+    )
+
+    async def send(chat_id, text):
+        pass
+
+    runtime._overload.level = DegradationLevel.DEFER_PERSISTENCE
+    await runtime._process_one(IncomingMessage(1, 10, 20, "Ann", "fyi I moved"), send)
+    runtime._overload.level = DegradationLevel.NORMAL
+    await runtime._process_one(IncomingMessage(2, 10, 20, "Ann", "what now?"), send)
+    await runtime.flush_deferred()
+
+    recent = await runtime._memory.get_recent_messages(10, limit=10)
+    assert [m.text for m in recent] == ["fyi I moved", "what now?", "reply #1"]
+    assert [m.created_at for m in recent] == sorted(m.created_at for m in recent)